@@ -0,0 +1,215 @@
+"""The benchmarks for the database."""
+
+import random
+import time
+import tracemalloc
+
+from bench_util import generate_movies, measure, record
+
+import mdb_config as config
+import mdb_database as db
+import mdb_query
+from mdb_movie import AudienceRating, Genre, Movie, MovieField
+
+# A query for each field that can be searched, which each match part of the catalogue
+FIELD_QUERIES = {
+    MovieField.NAME: "star",
+    MovieField.RELEASE_YEAR: 1999,
+    MovieField.AUDIENCE_RATING: AudienceRating.PG,
+    MovieField.RUNTIME: 120,
+    MovieField.GENRE: [Genre.COMEDY],
+    MovieField.STAR_RATING: 4,
+    MovieField.WHERE_TO_WATCH: "Netflix",
+}
+
+# Text searches without any words, which can't use the search table and fall back to LIKE
+# LIKE with a wildcard at the start can't use an index, so these are recorded but always scan the movies table
+LIKE_QUERIES = {
+    MovieField.NAME: "!!",
+    MovieField.WHERE_TO_WATCH: "+",
+}
+
+# Queries that search several fields at once, keyed by the name they are recorded with
+QUERIES = {
+    "genre_year_stars": "genre=comedy and year>=1999 and stars>=4",
+    "runtime_between": "runtime between 90 and 100",
+    "name_or_where_to_watch": "name=star or where_to_watch=netflix",
+}
+
+# The fields that scrolling through a sorted list is timed with
+SORT_FIELDS = [MovieField.NAME, MovieField.STAR_RATING, MovieField.WHERE_TO_WATCH]
+
+# The most pages read when scrolling through a sorted list, and the number of movies on each one
+PAGE_COUNT = 50
+PAGE_SIZE = 40
+
+# The number of movies read by ID
+GET_COUNT = 1000
+
+# The number of movies inserted one at a time, which is kept small since every one is a commit
+INSERT_COUNT = 200
+
+
+def create_catalogue(results: list[dict], size: int):
+    """Fill the database with a catalogue of the given size."""
+    start_time = time.perf_counter()
+    inserted = db.bulk_insert(generate_movies(size, size))
+    record(results, "database.bulk_insert", size, time.perf_counter() - start_time, inserted)
+
+
+def check_indexes(results: list[dict], size: int) -> bool:
+    """Check that searching every field uses an index instead of scanning the movies table.
+
+    Text searches that fall back to LIKE are the exception, since they always scan the movies table.
+    That happens when the query has no words, or when SQLite doesn't support the search table.
+
+    Returns whether every search that can use an index does.
+    """
+    all_use_indexes = True
+    searches = [(field.name.lower(), field, query) for field, query in FIELD_QUERIES.items()]
+    searches += [(f"{field.name.lower()}_like", field, query) for field, query in LIKE_QUERIES.items()]
+    for name, field, query in searches:
+        plan = db.get_query_plan(field, query)
+
+        # A plain scan reads every row, while scans of an index or the search table don't
+        uses_index = f"SCAN {db.MOVIES_TABLE}" not in plan
+        uses_like = field in db.SEARCH_FIELDS and (
+            not db.search_table_available or db.get_search_expression(field, query) is None
+        )
+        all_use_indexes = all_use_indexes and (uses_index or uses_like)
+
+        record(
+            results, f"database.query_plan.{name}", size, 0.0, 0, uses_index=uses_index, uses_like=uses_like, plan=plan
+        )
+
+    return all_use_indexes
+
+
+def bench_get(results: list[dict], size: int):
+    """Time reading movies by ID, with and without the movie cache."""
+    rng = random.Random(size)
+    ids = [rng.randint(1, size) for _ in range(GET_COUNT)]
+
+    def get_all_ids():
+        for id in ids:
+            db.get(id)
+
+    # Without the cache, every read is a query
+    cache_size = config.movie_cache_size
+    config.movie_cache_size = 0
+    db.on_movies_changed()
+    record(results, "database.get", size, measure(get_all_ids, 1), len(ids))
+
+    # With the cache, the first read fills it and then every read is served from memory
+    config.movie_cache_size = max(cache_size, len(ids))
+    get_all_ids()
+    record(results, "database.get_cached", size, measure(get_all_ids, 1), len(ids))
+    config.movie_cache_size = cache_size
+
+
+def bench_get_all(results: list[dict], size: int):
+    """Time reading and decoding every movie, then measure how much memory each one uses."""
+    movie_count = db.count()
+    repeat = 1 if size >= 1_000_000 else 3
+    record(results, "database.get_all", size, measure(db.get_all, 1, repeat), movie_count)
+
+    # Memory is measured separately, since tracing allocations slows everything down
+    tracemalloc.start()
+    movies = db.get_all()
+    (memory, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    record(results, "database.get_all_memory", size, 0.0, len(movies), bytes_per_movie=memory / len(movies))
+
+
+def bench_get_filter(results: list[dict], size: int):
+    """Time searching each field."""
+    for field, query in FIELD_QUERIES.items():
+        matches = len(db.get_filter(field, query))
+        seconds = measure(lambda: db.get_filter(field, query), 1)
+        record(results, f"database.get_filter.{field.name.lower()}", size, seconds, 1, matches=matches)
+
+
+def bench_queries(results: list[dict], size: int):
+    """Time running queries that search several fields at once, and record which indexes they use."""
+    for name, text in QUERIES.items():
+        (query, _) = mdb_query.parse(text)
+        sql_filter = mdb_query.compile_query(query)
+        plan = db.get_filter_plan(sql_filter)
+
+        # The search cache is cleared each time, so every run is a query
+        def run_query():
+            db.on_movies_changed()
+            return db.get_filter_ids(sql_filter)
+
+        matches = len(run_query())
+        seconds = measure(run_query, 1)
+        uses_index = f"SCAN {db.MOVIES_TABLE}" not in plan
+        record(results, f"database.query.{name}", size, seconds, 1, matches=matches, uses_index=uses_index, plan=plan)
+
+
+def bench_sorted_pages(results: list[dict], size: int):
+    """Time scrolling down the movies sorted by each field, starting halfway through the list.
+
+    Continuing on from the last movie of each page is compared to skipping rows with an offset.
+    """
+    start_index = size // 2
+
+    # Small catalogues don't have enough movies after the start for every page
+    page_count = min(PAGE_COUNT, (size - start_index - 1) // PAGE_SIZE)
+    if page_count <= 0:
+        return
+
+    for sort_field in SORT_FIELDS:
+        start = db.get_page(None, 1, start_index, sort_field=sort_field, descending=True)[0]
+
+        def scroll_after_movie():
+            after = start
+            for _ in range(page_count):
+                after = db.get_page(after, PAGE_SIZE, sort_field=sort_field, descending=True)[-1]
+
+        def scroll_with_offset():
+            for page in range(page_count):
+                offset = start_index + 1 + page * PAGE_SIZE
+                db.get_page(None, PAGE_SIZE, offset, sort_field=sort_field, descending=True)
+
+        name = sort_field.name.lower()
+        record(results, f"database.sorted_page.{name}", size, measure(scroll_after_movie, 1), page_count)
+        record(results, f"database.sorted_page_offset.{name}", size, measure(scroll_with_offset, 1), page_count)
+
+
+def bench_insert(results: list[dict], size: int):
+    """Time inserting movies one at a time, with a commit for each one and with one commit for all of them.
+
+    This adds movies to the catalogue, so it should be run last.
+    """
+    movies = list(generate_movies(INSERT_COUNT, -size))
+
+    start_time = time.perf_counter()
+    for movie in movies:
+        db.insert(movie)
+
+    record(results, "database.insert", size, time.perf_counter() - start_time, len(movies))
+
+    def insert_all(movies: list[Movie]):
+        for movie in movies:
+            db.insert(movie)
+
+    start_time = time.perf_counter()
+    db.run_in_transaction(insert_all, movies)
+    record(results, "database.insert_in_transaction", size, time.perf_counter() - start_time, len(movies))
+
+
+def run(results: list[dict], size: int) -> bool:
+    """Run the database benchmarks on a catalogue of the given size, which should be empty apart from the seed data.
+
+    Returns whether every search uses an index.
+    """
+    create_catalogue(results, size)
+    all_use_indexes = check_indexes(results, size)
+    bench_get(results, size)
+    bench_get_all(results, size)
+    bench_get_filter(results, size)
+    bench_queries(results, size)
+    bench_sorted_pages(results, size)
+    bench_insert(results, size)
+    return all_use_indexes
@@ -0,0 +1,30 @@
+"""The benchmarks for the movie model."""
+
+from bench_util import measure, record
+
+from mdb_movie import Genre, MovieField
+
+# Typical input for each field, as the user would type it
+FIELD_INPUTS = {
+    MovieField.NAME: "The Matrix",
+    MovieField.RELEASE_YEAR: "1999",
+    MovieField.AUDIENCE_RATING: "PG-13",
+    MovieField.RUNTIME: "136",
+    MovieField.GENRE: "action, scifi",
+    MovieField.STAR_RATING: "5",
+    MovieField.WHERE_TO_WATCH: "Netflix",
+}
+
+# The number of times each function is called per timing
+NUMBER = 20000
+
+
+def run(results: list[dict]):
+    """Run the model benchmarks."""
+    for field, user_input in FIELD_INPUTS.items():
+        seconds = measure(lambda: field.validate_field(user_input), NUMBER)
+        record(results, f"model.validate_field.{field.name.lower()}", None, seconds, NUMBER)
+
+    # This is the format genres are stored in the database
+    seconds = measure(lambda: Genre.list_from_str("1:3:9"), NUMBER)
+    record(results, "model.genre_list_from_str", None, seconds, NUMBER)
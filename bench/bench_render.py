@@ -0,0 +1,92 @@
+"""The benchmarks for rendering the UI, which is written to memory instead of a console."""
+
+import contextlib
+import io
+import sys
+import time
+
+from bench_util import record
+
+import mdb_console as console
+import mdb_ui as ui
+
+# The size of the console, which is large so it is the worst case
+WIDTH = 300
+HEIGHT = 80
+
+# The number of frames that are rendered per timing
+FRAMES = 200
+
+
+def display_frames(commands: list[str]) -> tuple[float, int, int]:
+    """Display a frame for each command, with the commands given as the input after each frame.
+
+    Returns a tuple: (Seconds, TotalCharactersWritten, TotalCellsRendered)
+    """
+    characters = 0
+    cells = 0
+    stdin = io.StringIO("".join(f"{command}\n" for command in commands))
+    stdout = io.StringIO()
+
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(stdout):
+        old_stdin = sys.stdin
+        sys.stdin = stdin
+        try:
+            for _ in commands:
+                console.display()
+                characters += console.frame_size
+                cells += console.cells_rendered
+        finally:
+            sys.stdin = old_stdin
+
+    return (time.perf_counter() - start_time, characters, cells)
+
+
+def run(results: list[dict], size: int):
+    """Run the render benchmarks on the movie list of a catalogue of the given size.
+
+    This sets up the UI, so it can only be run once.
+    """
+    # There is no console, so it always has the same size
+    console.get_size = lambda: (WIDTH, HEIGHT)
+
+    # Go to the movie list
+    ui.init_pages()
+    console.setup(ui.render_current_page)
+    display_frames(["view_all"])
+
+    # Every frame redraws every cell, by scrolling up at the top of the list which doesn't move it
+    (seconds, characters, cells) = (0.0, 0, 0)
+    for _ in range(FRAMES):
+        console.invalidate()
+        (frame_seconds, frame_characters, frame_cells) = display_frames(["w"])
+        seconds += frame_seconds
+        characters += frame_characters
+        cells += frame_cells
+
+    extra = {"width": WIDTH, "height": HEIGHT}
+    record(
+        results,
+        "render.full_frame",
+        size,
+        seconds,
+        FRAMES,
+        bytes_per_frame=characters / FRAMES,
+        cells_per_frame=cells / FRAMES,
+        **extra,
+    )
+
+    # Scrolling only redraws the cells that changed
+    commands = ["s", "w"] * (FRAMES // 2)
+    (seconds, characters, cells) = display_frames(commands)
+    record(
+        results,
+        "render.scroll_frame",
+        size,
+        seconds,
+        len(commands),
+        bytes_per_frame=characters / len(commands),
+        cells_per_frame=cells / len(commands),
+        **extra,
+    )
@@ -0,0 +1,54 @@
+"""The code shared by the benchmarks, for timing code and making catalogues of movies."""
+
+import random
+import timeit
+from collections.abc import Callable, Iterator
+
+from mdb_movie import AudienceRating, Genre, Movie
+
+# Words used to make up movie names
+# "star" is searched for by the name benchmarks, so it is always one of the words
+NAME_ADJECTIVES = ["Dark", "Last", "Silent", "Lost", "Hidden", "Final", "Golden", "Broken", "Frozen", "Wild"]
+NAME_NOUNS = ["Star", "Kingdom", "River", "Empire", "Night", "Garden", "Machine", "Island", "Storm", "Promise"]
+
+WHERE_TO_WATCH = ["Netflix", "Disney+", "Prime Video", "Hulu", "Cinema", "Apple TV+", None]
+
+
+def generate_movies(count: int, seed: int = 0) -> Iterator[Movie]:
+    """Generate a catalogue of made up movies, which is always the same for the same count and seed."""
+    rng = random.Random(seed)
+    genres = list(Genre)
+    audience_ratings = list(AudienceRating)
+
+    for number in range(count):
+        name = f"The {rng.choice(NAME_ADJECTIVES)} {rng.choice(NAME_NOUNS)} {number}"
+        movie_genres = rng.sample(genres, rng.randint(1, 3))
+
+        yield Movie(
+            0,
+            name,
+            rng.randint(1900, 2025),
+            rng.choice(audience_ratings),
+            rng.randint(70, 200),
+            movie_genres,
+            rng.randint(1, 5),
+            rng.choice(WHERE_TO_WATCH),
+        )
+
+
+def measure(function: Callable[[], any], number: int, repeat: int = 3) -> float:
+    """Get the fastest time in seconds that it took to run the function the given number of times."""
+    return min(timeit.Timer(function).repeat(repeat, number))
+
+
+def record(results: list[dict], name: str, catalogue_size: int | None, seconds: float, operations: int, **extra):
+    """Add the result of a benchmark to the list of results."""
+    result = {
+        "name": name,
+        "catalogue_size": catalogue_size,
+        "seconds": seconds,
+        "operations": operations,
+        "per_second": operations / seconds if seconds > 0 else None,
+    }
+    result.update(extra)
+    results.append(result)
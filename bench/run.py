@@ -0,0 +1,99 @@
+"""Run the benchmarks and print the results as JSON.
+
+The benchmarks don't need a console, so they can be run anywhere, such as in CI.
+Each catalogue is generated into a temporary database, which is deleted afterwards.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+
+# The benchmarks use the modules of the app directly
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# The database has to be imported before the movies, since they import each other
+import mdb_config as config  # noqa: E402
+import mdb_database as db  # noqa: E402
+
+# isort: split
+import bench_database  # noqa: E402
+import bench_model  # noqa: E402
+import bench_render  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the parser for the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark MDB and print the results as JSON.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="The number of movies in each catalogue (default: 10000 100000 1000000)",
+    )
+    parser.add_argument("--output", help="The file to write the results to (default: print them)")
+    parser.add_argument("--profile", choices=config.PROFILES.keys(), help="The database settings to use")
+    return parser
+
+
+def log(message: str):
+    """Show the progress, without mixing it into the results."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def main() -> int:
+    """Run the benchmarks and return the exit code, which is 1 if a search doesn't use an index."""
+    arguments = create_parser().parse_args()
+    config.load(["--profile", arguments.profile] if arguments.profile is not None else [])
+
+    results = []
+    all_use_indexes = True
+
+    log("Benchmarking the model")
+    bench_model.run(results)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index, size in enumerate(arguments.sizes):
+            log(f"Benchmarking a catalogue of {size} movies")
+            config.database_path = os.path.join(directory, f"bench_{size}.db")
+            db.setup()
+
+            all_use_indexes = bench_database.run(results, size) and all_use_indexes
+
+            # The UI can only be set up once, so it is rendered with the first catalogue
+            if index == 0:
+                bench_render.run(results, size)
+
+            db.close()
+
+    output = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "profile": config.profile,
+        "results": results,
+    }
+
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(output, file, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+    if not all_use_indexes:
+        log("Error: some searches don't use an index - see the database.query_plan results")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,28 @@
 """The main file for MDB."""
 
+import sys
+
+import mdb_config as config
 import mdb_console as console
 import mdb_database as db
+import mdb_script as script
+import mdb_stats as stats
 import mdb_ui as ui
 
 if __name__ == "__main__":
+    config.load()
     db.setup()
     ui.init_pages()
-    console.setup(ui.render_current_page)
-    console.run()
+
+    exit_code = 0
+    try:
+        # Scripts don't need a console, so they skip setting one up
+        if config.script_path is not None:
+            exit_code = script.run(config.script_path)
+        else:
+            console.setup(ui.render_current_page)
+            console.run()
+    finally:
+        stats.dump(db.get_cache_counters())
+
+    sys.exit(exit_code)
@@ -14,18 +14,28 @@ class Command:
         self._name = name
         self._action = action
 
-        # Automatically figure out how many args there are
-        self._arg_count = len(inspect.signature(action).parameters)
+        # Automatically figure out the args, which only needs to be done once since the action never changes
+        # An action with *args takes the rest of the args after its other parameters, such as the words of a query
+        # Parameters with default values can be left out
+        self._parameters = []
+        self._rest = None
+        self._required_arg_count = 0
+        for parameter in inspect.signature(action).parameters.values():
+            if parameter.kind == parameter.VAR_POSITIONAL:
+                self._rest = parameter.name
+            else:
+                self._parameters.append(parameter.name)
+                if parameter.default is parameter.empty:
+                    self._required_arg_count += 1
+
+        self._arg_count = len(self._parameters)
+        self._text = name + "".join(f" [{parameter}]" for parameter in self._parameters)
+        if self._rest is not None:
+            self._text += f" [{self._rest}...]"
 
     def __str__(self):
         """Convert this command into a string."""
-        output = self.name
-
-        parameters = inspect.signature(self.action).parameters.keys()
-        for parameter in parameters:
-            output += f" [{parameter}]"
-
-        return output
+        return self._text
 
     @property
     def name(self):
@@ -44,8 +54,18 @@ class Command:
 
     def invoke(self, args):
         """Run the command with the given arguments."""
-        if len(args) != self.arg_count:
-            ui.current_page.error_message = f"Incorrect argument count ({len(args)} instead of {self.arg_count})"
+        if self._rest is not None and len(args) < self._required_arg_count:
+            expected = f"at least {self._required_arg_count}"
+            ui.current_page.error_message = f"Incorrect argument count ({len(args)} instead of {expected})"
+            return
+
+        if self._rest is None and not self._required_arg_count <= len(args) <= self.arg_count:
+            if self._required_arg_count == self.arg_count:
+                expected = f"{self.arg_count}"
+            else:
+                expected = f"{self._required_arg_count} to {self.arg_count}"
+
+            ui.current_page.error_message = f"Incorrect argument count ({len(args)} instead of {expected})"
             return
 
         self.action(*args)
@@ -61,24 +81,57 @@ commands = [
     Command("exit", command_exit),
 ]
 
+# The available commands, and the commands that each lower case name or start of a name could refer to
+# These are only rebuilt when the available commands change, which is checked with the key
+available_commands = []
+command_index = {}
+command_index_key = None
 
-def find(name: str) -> Command | None:
-    """Find a command with the given name."""
-    for command in get_available_commands():
-        if command.name.lower() == name.lower():
-            return command
 
-    return None
+def update_command_index():
+    """Rebuild the list of available commands and the command index if the available commands changed."""
+    global available_commands
+    global command_index
+    global command_index_key
 
+    page = ui.current_page
+    key = (page.getting_input, page.global_commands_available, tuple(page.commands), len(commands))
+    if key == command_index_key:
+        return
 
-def get_available_commands() -> list[Command]:
-    """Get a list of the available commands."""
-    # Return if we are getting input
-    if ui.current_page.getting_input:
-        return []
+    command_index_key = key
 
+    # No commands are available if we are getting input
     # Otherwise check if we are allowed global commands
-    if ui.current_page.global_commands_available:
-        return ui.current_page.commands + commands
+    if page.getting_input:
+        available_commands = []
+    elif page.global_commands_available:
+        available_commands = page.commands + commands
     else:
-        return ui.current_page.commands
+        available_commands = page.commands.copy()
+
+    # Index every start of every name, so commands can be abbreviated
+    command_index = {}
+    for command in available_commands:
+        name = command.name.lower()
+        for length in range(1, len(name) + 1):
+            matches = command_index.setdefault(name[:length], [])
+            if command not in matches:
+                matches.append(command)
+
+    # A full name always refers to its own command, even if it is also the start of other names
+    # The first command with the name is used, so page commands take priority over global ones
+    for command in reversed(available_commands):
+        command_index[command.name.lower()] = [command]
+
+
+def find_matches(name: str) -> list[Command]:
+    """Find the commands with the given name, or the commands that start with it if none have that name."""
+    update_command_index()
+    return command_index.get(name.lower(), [])
+
+
+def get_available_commands() -> list[Command]:
+    """Get a list of the available commands."""
+    update_command_index()
+    return available_commands
@@ -0,0 +1,125 @@
+"""The code related to configuring MDB.
+
+Each setting comes from a profile, which can be overridden by an environment variable,
+which can be overridden by a command line argument.
+"""
+
+import argparse
+import os
+
+JOURNAL_MODES = ["delete", "truncate", "persist", "memory", "wal", "off"]
+SYNCHRONOUS_MODES = ["off", "normal", "full", "extra"]
+
+# Named groups of settings
+# The default profile matches SQLite's own defaults
+# It leaves the journal mode as None, so a database that was switched to WAL mode stays in it
+# The production profile lets readers run while a write is happening and reads large tables through memory mapping
+PROFILES = {
+    "default": {
+        "database_path": "Database.db",
+        "journal_mode": None,
+        "synchronous": "full",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "busy_timeout": 5000,
+        "movie_cache_size": 1000,
+    },
+    "production": {
+        "database_path": "Database.db",
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+        "movie_cache_size": 10000,
+    },
+}
+
+DEFAULT_PROFILE = "default"
+
+# The settings that can be changed, as (Name, EnvironmentVariable, Type, Choices | None, Description)
+SETTINGS = [
+    ("database_path", "MDB_DATABASE", str, None, "The path to the database file"),
+    ("journal_mode", "MDB_JOURNAL_MODE", str.lower, JOURNAL_MODES, "The SQLite journal mode"),
+    ("synchronous", "MDB_SYNCHRONOUS", str.lower, SYNCHRONOUS_MODES, "How often SQLite waits for writes to finish"),
+    ("cache_size", "MDB_CACHE_SIZE", int, None, "The SQLite page cache size (pages, or KiB if negative)"),
+    ("mmap_size", "MDB_MMAP_SIZE", int, None, "The number of bytes of the database to memory map"),
+    ("busy_timeout", "MDB_BUSY_TIMEOUT", int, None, "How many milliseconds to wait for a locked database"),
+    ("movie_cache_size", "MDB_MOVIE_CACHE_SIZE", int, None, "How many movies to keep in memory after reading them"),
+]
+
+# The current settings, which are the default profile until load is called
+profile = DEFAULT_PROFILE
+database_path = PROFILES[DEFAULT_PROFILE]["database_path"]
+journal_mode = PROFILES[DEFAULT_PROFILE]["journal_mode"]
+synchronous = PROFILES[DEFAULT_PROFILE]["synchronous"]
+cache_size = PROFILES[DEFAULT_PROFILE]["cache_size"]
+mmap_size = PROFILES[DEFAULT_PROFILE]["mmap_size"]
+busy_timeout = PROFILES[DEFAULT_PROFILE]["busy_timeout"]
+movie_cache_size = PROFILES[DEFAULT_PROFILE]["movie_cache_size"]
+
+# The script to run instead of the console UI, or "-" to read it from stdin
+script_path = None
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the parser for the command line arguments."""
+    parser = argparse.ArgumentParser(description="A console-based movie database.")
+    parser.add_argument(
+        "--profile",
+        choices=PROFILES.keys(),
+        help=f"The group of settings to start from (default: {DEFAULT_PROFILE}, env: MDB_PROFILE)",
+    )
+
+    for name, environment_variable, value_type, choices, description in SETTINGS:
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            dest=name,
+            type=value_type,
+            choices=choices,
+            help=f"{description} (env: {environment_variable})",
+        )
+
+    parser.add_argument(
+        "--exec",
+        dest="script_path",
+        metavar="SCRIPT",
+        help="Run the commands in a file (or - for stdin) without the UI, printing each result as a line of JSON",
+    )
+    return parser
+
+
+def load(args: list[str] | None = None):
+    """Load the settings from the environment variables and the command line arguments.
+
+    Exits with an error message if any of the settings are invalid.
+    """
+    global profile
+    global script_path
+
+    parser = create_parser()
+    arguments = parser.parse_args(args)
+    script_path = arguments.script_path
+
+    # Get the profile
+    profile = arguments.profile or os.environ.get("MDB_PROFILE", DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        parser.error(f"invalid profile in MDB_PROFILE: '{profile}' (choose from {', '.join(PROFILES)})")
+
+    for name, environment_variable, value_type, choices, _ in SETTINGS:
+        # Command line arguments are already validated by the parser
+        value = getattr(arguments, name)
+
+        if value is None and environment_variable in os.environ:
+            try:
+                value = value_type(os.environ[environment_variable])
+            except ValueError:
+                parser.error(f"invalid value in {environment_variable}: '{os.environ[environment_variable]}'")
+
+            if choices is not None and value not in choices:
+                parser.error(f"invalid value in {environment_variable}: '{value}' (choose from {', '.join(choices)})")
+
+        if value is None:
+            value = PROFILES[profile][name]
+
+        globals()[name] = value
@@ -5,27 +5,94 @@ as well as https://en.wikipedia.org/wiki/ANSI_escape_code
 and https://stackoverflow.com/questions/4842424/list-of-ansi-color-escape-sequences.
 
 Note that the buffer has (0, 0) at the TOP LEFT of the terminal.
-Unfortunately, it doesn't properly handle resizing until the UI is rerendered.
-I might make it so when the console is resized then the UI will automaatically rerender.
+The buffers are flat lists stored row by row, so the cell at (x, y) is at index y * width + x.
+The previous frame is kept so only the cells that changed are redrawn, which avoids flickering.
+The UI runs in an asyncio event loop, which rerenders it when the user gives input, when the console is resized,
+and when background work finishes, so it never has to block while waiting for one of them.
+Windows doesn't have resize signals and can't wait on the console in an event loop,
+so there it blocks on input and is only rerendered after the next input.
 """
 
+import array
+import asyncio
+import codecs
 import os
+import signal
+import sys
+from collections.abc import Callable
+
+import mdb_stats as stats
 
 ESCAPE_CHAR = chr(27)
 CLEAR_COLOR_SEQUENCE = "[0m"
 
+# https://en.wikipedia.org/wiki/Box-drawing_characters
+HORIZONTAL_BAR_CHAR = "─"
+VERTICAL_BAR_CHAR = "│"
+CORNER_BAR_CHARS = "┌┐└┘"
+
+# Characters that would move the cursor, so they are never written to the buffer
+CONTROL_CHARS = "\n\t\r"
+
+# The colour used for cells that use the default colour of the console
+DEFAULT_COLOUR = -1
+
 # Buffer of characters
 buffer = []
 
 # Buffer of foreground and background colours
-# tuple[int, int, int] (rgb values)
-# If a characters colour is set to none, then it uses the default colour
-fg_colours = []
-bg_colours = []
+# The colours are packed into ints as 0xRRGGBB, since it is much smaller than tuples
+# If a characters colour is set to DEFAULT_COLOUR, then it uses the default colour
+fg_colours = array.array("l")
+bg_colours = array.array("l")
 
 width = 0
 height = 0
 
+# The buffers of the previous frame, which are compared against so only the changes are drawn
+# The buffers are swapped every frame, so they are only allocated when the console is resized
+previous_buffer = []
+previous_fg_colours = array.array("l")
+previous_bg_colours = array.array("l")
+
+# Empty buffers that are copied into the buffers to clear them
+empty_buffer = []
+empty_colours = array.array("l")
+
+# The escape sequences for each colour, since there are only a few colours used
+colour_sequences = {}
+
+# Whether the whole screen needs to be redrawn on the next frame, instead of only the changes
+full_redraw = True
+
+# Unchanged cells between two changed cells are redrawn if there are at most this many of them,
+# since it is shorter than the escape sequence to move the cursor past them
+MAX_UNCHANGED_GAP = 4
+
+# The number of characters written to the console in the last frame
+frame_size = 0
+
+# The number of cells that were drawn in the current frame, not counting ones copied from layers
+cells_rendered = 0
+
+# The number of cells that were drawn in the last frame, since the current count is incomplete until it is rendered
+last_cells_rendered = 0
+
+# Fills a layer's buffer before it is drawn, so the cells that weren't drawn can be found
+UNDRAWN_CHAR = "\0"
+
+# Resizing a window sends lots of resize signals, so the UI waits until they stop for this long before rerendering
+RESIZE_DEBOUNCE_SECONDS = 0.05
+
+# Input that has been read but hasn't ended with a newline yet
+pending_input = ""
+
+# The event loop the UI is running in, which is None when it is blocking on input instead
+loop: asyncio.AbstractEventLoop = None
+
+# The timer that rerenders the UI once the console stops being resized
+resize_timer: asyncio.TimerHandle = None
+
 # Render callback
 render = None
 
@@ -53,8 +120,110 @@ def setup(render_callback):
 
 def run():
     """Run the console UI."""
-    while is_running:
-        display()
+    # Windows can't wait on the console and a signal together, so it just waits for input
+    if not hasattr(signal, "SIGWINCH"):
+        while is_running:
+            display()
+        return
+
+    run_event_loop()
+
+
+def run_event_loop():
+    """Run the console UI in an event loop, rerendering it whenever something changes."""
+    global loop
+
+    loop = asyncio.new_event_loop()
+    errors = []
+
+    def on_error(loop: asyncio.AbstractEventLoop, context: dict):
+        # The event loop only logs errors by default, but they should still crash the app
+        errors.append(context.get("exception") or RuntimeError(context["message"]))
+        loop.stop()
+
+    loop.set_exception_handler(on_error)
+
+    decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+    loop.add_reader(sys.stdin.fileno(), read_input, decoder)
+    loop.add_signal_handler(signal.SIGWINCH, on_resize)
+
+    try:
+        loop.call_soon(draw)
+        loop.run_forever()
+    finally:
+        loop.remove_reader(sys.stdin.fileno())
+        loop.remove_signal_handler(signal.SIGWINCH)
+
+        # Cancel any background work that is still being waited on, so it isn't destroyed while pending
+        # Gathering nothing would use a different event loop, so it is only done if there are tasks
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+
+        if len(tasks) > 0:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+        loop = None
+
+    if len(errors) > 0:
+        raise errors[0]
+
+
+def on_resize():
+    """Wait for the console to stop being resized, then rerender the UI."""
+    global resize_timer
+
+    # Resizing sends lots of signals, so restart the timer every time one arrives
+    if resize_timer is not None:
+        resize_timer.cancel()
+
+    resize_timer = loop.call_later(RESIZE_DEBOUNCE_SECONDS, on_resize_finished)
+
+
+def on_resize_finished():
+    """Rerender the UI if the console was resized."""
+    global resize_timer
+    resize_timer = None
+
+    # Input might have already rerendered the UI at the new size
+    if get_size() != (width, height):
+        redraw()
+
+
+def redraw():
+    """Rerender the UI without any new input, so no commands are run again."""
+    global user_input
+    user_input = None
+    draw()
+
+
+def request_redraw():
+    """Rerender the UI once the event loop is free, such as when background work finishes."""
+    if loop is not None:
+        loop.call_soon(redraw)
+
+
+def read_input(decoder: codecs.IncrementalDecoder):
+    """Read the available input, then handle each complete line of it."""
+    global pending_input
+    global is_running
+
+    data = os.read(sys.stdin.fileno(), 4096)
+    pending_input += decoder.decode(data, len(data) == 0)
+
+    # There is no more input if the console was closed
+    if len(data) == 0:
+        if pending_input == "":
+            is_running = False
+            redraw()
+            return
+
+        pending_input += "\n"
+
+    while "\n" in pending_input and is_running:
+        (line, pending_input) = pending_input.split("\n", 1)
+        handle_input(line)
+        draw()
 
 
 def print_escape_sequence(sequence: str):
@@ -62,6 +231,17 @@ def print_escape_sequence(sequence: str):
     print(f"{ESCAPE_CHAR}{sequence}", end="")
 
 
+def get_cursor_sequence(x: int, y: int) -> str:
+    """Get the escape sequence that moves the cursor of the console to the given coordinate."""
+    return f"{ESCAPE_CHAR}[{y + 1};{x + 1}H"
+
+
+def invalidate():
+    """Make the whole screen redraw on the next frame."""
+    global full_redraw
+    full_redraw = True
+
+
 def clear():
     """Clear the console."""
     print_escape_sequence("c")
@@ -71,85 +251,247 @@ def get_size() -> tuple[int, int]:
     """Get the size of the console."""
     size = os.get_terminal_size()
 
-    # Subtract 1 so we can have room for user input
-    return (size.columns, size.lines - 1)
+    # Subtract 2 so we can have room for user input and the line it moves to when enter is pressed
+    return (size.columns, size.lines - 2)
 
 
 def recreate_buffer():
-    """Recreate the screen buffer and clear it."""
+    """Clear the screen buffer, which is only reallocated when the size of the console changes."""
     global buffer
     global fg_colours
     global bg_colours
+    global previous_buffer
+    global previous_fg_colours
+    global previous_bg_colours
+    global empty_buffer
+    global empty_colours
     global width
     global height
+    global full_redraw
+    global cells_rendered
+
+    cells_rendered = 0
 
     size = get_size()
-    width = size[0]
-    height = size[1]
-    buffer = [[" " for y in range(height)] for x in range(width)]
-    fg_colours = [[None for y in range(height)] for x in range(width)]
-    bg_colours = [[None for y in range(height)] for x in range(width)]
+    if size != (width, height):
+        # The previous frame can't be compared against if the size changed
+        full_redraw = True
+
+        width = size[0]
+        height = size[1]
+        empty_buffer = [" "] * (width * height)
+        empty_colours = array.array("l", [DEFAULT_COLOUR]) * (width * height)
+
+        buffer = empty_buffer.copy()
+        fg_colours = empty_colours[:]
+        bg_colours = empty_colours[:]
+        previous_buffer = empty_buffer.copy()
+        previous_fg_colours = empty_colours[:]
+        previous_bg_colours = empty_colours[:]
+        return
 
+    buffer[:] = empty_buffer
+    fg_colours[:] = empty_colours
+    bg_colours[:] = empty_colours
 
-def set_text_colour(
-    current_colour: tuple[int, int, int] | None, colour: tuple[int, int, int] | None, is_foreground: bool = True
-):
-    """Set the text colour of the console."""
-    if current_colour == colour:
-        # Return original if nothing changed
-        return current_colour
 
-    # If the intended colour is different to the actual colour, then change it
+def pack_colour(colour: tuple[int, int, int] | None) -> int:
+    """Pack a colour into an int that can be stored in the colour buffers."""
     if colour is None:
+        return DEFAULT_COLOUR
+
+    return (colour[0] << 16) | (colour[1] << 8) | colour[2]
+
+
+def get_colour_sequence(colour: int, is_foreground: bool = True) -> str:
+    """Get the escape sequence that sets the text colour of the console to a packed colour."""
+    key = (colour, is_foreground)
+    sequence = colour_sequences.get(key)
+    if sequence is not None:
+        return sequence
+
+    if colour == DEFAULT_COLOUR:
         # Reset to default
-        print_escape_sequence(f"[{39 if is_foreground else 49}m")
+        sequence = f"{ESCAPE_CHAR}[{39 if is_foreground else 49}m"
     else:
-        print_escape_sequence(f"[{38 if is_foreground else 48};2;{colour[0]};{colour[1]};{colour[2]}m")
+        red = (colour >> 16) & 0xFF
+        green = (colour >> 8) & 0xFF
+        blue = colour & 0xFF
+        sequence = f"{ESCAPE_CHAR}[{38 if is_foreground else 48};2;{red};{green};{blue}m"
 
-    # Return new colour
-    return colour
+    colour_sequences[key] = sequence
+    return sequence
 
 
-def display():
-    """Render the UI, display the buffer to the screen, then clear it afterwards."""
-    global user_input
-    global is_running
+def is_cell_changed(index: int) -> bool:
+    """Check if the cell at the given index is different to the previous frame."""
+    return (
+        buffer[index] != previous_buffer[index]
+        or fg_colours[index] != previous_fg_colours[index]
+        or bg_colours[index] != previous_bg_colours[index]
+    )
+
+
+def get_changed_runs(y: int) -> list[tuple[int, int]]:
+    """Get the runs of cells in a row that are different to the previous frame.
+
+    Returns a list of tuples: (StartX, EndX) where EndX is exclusive
+    """
+    # Every cell is changed if the whole screen is being redrawn
+    if full_redraw:
+        return [(0, width)]
+
+    # Most rows don't change, which can be checked much faster by comparing the entire rows
+    row_start = y * width
+    row_end = row_start + width
+    if (
+        buffer[row_start:row_end] == previous_buffer[row_start:row_end]
+        and fg_colours[row_start:row_end] == previous_fg_colours[row_start:row_end]
+        and bg_colours[row_start:row_end] == previous_bg_colours[row_start:row_end]
+    ):
+        return []
+
+    runs = []
+    x = 0
+    while x < width:
+        if not is_cell_changed(row_start + x):
+            x += 1
+            continue
+
+        # Extend the run until there is a big enough gap of unchanged cells
+        start_x = x
+        end_x = x + 1
+        gap = 0
+        x += 1
+        while x < width and gap <= MAX_UNCHANGED_GAP:
+            if is_cell_changed(row_start + x):
+                end_x = x + 1
+                gap = 0
+            else:
+                gap += 1
+
+            x += 1
+
+        runs.append((start_x, end_x))
+
+    return runs
+
+
+def get_frame_output() -> str:
+    """Get the text that displays the changes to the buffer since the last frame.
+
+    This remembers the buffer as the last frame, so it should only be called once per frame.
+    """
+    global buffer
+    global fg_colours
+    global bg_colours
+    global previous_buffer
+    global previous_fg_colours
+    global previous_bg_colours
+    global full_redraw
+
+    output = []
+    current_fg_colour = DEFAULT_COLOUR
+    current_bg_colour = DEFAULT_COLOUR
+    if full_redraw:
+        output.append(f"{ESCAPE_CHAR}{CLEAR_COLOR_SEQUENCE}{ESCAPE_CHAR}[2J")
+
+    for y in range(height):
+        row_start = y * width
+        for start_x, end_x in get_changed_runs(y):
+            output.append(get_cursor_sequence(start_x, y))
+
+            index = row_start + start_x
+            end_index = row_start + end_x
+            while index < end_index:
+                fg_colour = fg_colours[index]
+                bg_colour = bg_colours[index]
+
+                if fg_colour != current_fg_colour:
+                    output.append(get_colour_sequence(fg_colour, True))
+                    current_fg_colour = fg_colour
+
+                if bg_colour != current_bg_colour:
+                    output.append(get_colour_sequence(bg_colour, False))
+                    current_bg_colour = bg_colour
+
+                # Write all of the following cells with the same colours at once
+                run_end_index = index + 1
+                while (
+                    run_end_index < end_index
+                    and fg_colours[run_end_index] == fg_colour
+                    and bg_colours[run_end_index] == bg_colour
+                ):
+                    run_end_index += 1
+
+                output.append("".join(buffer[index:run_end_index]))
+                index = run_end_index
+
+    # Clear the colour
+    output.append(f"{ESCAPE_CHAR}{CLEAR_COLOR_SEQUENCE}")
+
+    # Clear the previous input and print a cursor so the user can give input
+    # The input is on the second last line, so pressing enter doesn't scroll the screen
+    output.append(get_cursor_sequence(0, height))
+    output.append(f"{ESCAPE_CHAR}[2K > ")
+
+    # Remember this frame to compare against the next one, and reuse the old one for the next frame
+    (buffer, previous_buffer) = (previous_buffer, buffer)
+    (fg_colours, previous_fg_colours) = (previous_fg_colours, fg_colours)
+    (bg_colours, previous_bg_colours) = (previous_bg_colours, bg_colours)
+    full_redraw = False
+
+    return "".join(output)
+
+
+def draw():
+    """Render the UI and display the changes to the buffer on the screen."""
+    global frame_size
+    global last_cells_rendered
 
     # Render the buffer
-    recreate_buffer()
-    render()
+    with stats.timer("console.render"):
+        recreate_buffer()
+        render()
+
+    last_cells_rendered = cells_rendered
 
     # Leave if we don't want to run
     if not is_running:
         clear()
+        if loop is not None:
+            loop.stop()
         return
 
-    # Clear the screen and display buffer contents
-    current_fg_colour = None
-    current_bg_colour = None
-    clear()
+    # Display the frame with a single write
+    with stats.timer("console.output"):
+        output = get_frame_output()
+        frame_size = len(output)
+        sys.stdout.write(output)
+        sys.stdout.flush()
 
-    for y in range(height):
-        for x in range(width):
-            fg_colour = fg_colours[x][y]
-            bg_colour = bg_colours[x][y]
+    if stats.enabled:
+        stats.record_frame(cells_rendered, frame_size)
 
-            current_fg_colour = set_text_colour(current_fg_colour, fg_colour, True)
-            current_bg_colour = set_text_colour(current_bg_colour, bg_colour, False)
 
-            print(buffer[x][y], end="", flush=False)
+def handle_input(text: str):
+    """Remember the input the user gave, so the next frame can use it."""
+    global user_input
+    global full_redraw
 
-        # Newline
-        # Even though the buffer will overflow to the next line normally,
-        # the console can be resized which will affect how it overflows
-        print("", flush=False)
+    user_input = text.rstrip("\r")
+
+    # Long input wraps onto the next lines, which scrolls the screen
+    if len(user_input) + 3 >= width:
+        full_redraw = True
 
-    # Clear the colour
-    print_escape_sequence(CLEAR_COLOR_SEQUENCE)
 
-    # Flush the buffer and print a cursor so the user can give input
-    print(" > ", end="", flush=True)
-    user_input = input()
+def display():
+    """Render the UI, display the changes to the buffer on the screen, then wait for input."""
+    draw()
+
+    if is_running:
+        handle_input(input())
 
 
 def set(
@@ -160,6 +502,8 @@ def set(
     bg_colour: tuple[int, int, int] | None = None,
 ):
     """Write the given character to the buffer at the given coordinate."""
+    global cells_rendered
+
     # Clamp (including negatives)
     if x >= width or y >= height or x < -width or y < -height:
         return
@@ -172,20 +516,40 @@ def set(
     if char == "\n" or char == "\t" or char == "\r":
         return
 
+    # Make negative indices positive, since they count from the right and bottom of the screen
+    if x < 0:
+        x += width
+
+    if y < 0:
+        y += height
+
     # Write to the buffers
-    buffer[x][y] = char
-    fg_colours[x][y] = fg_colour
-    bg_colours[x][y] = bg_colour
+    cells_rendered += 1
 
+    index = y * width + x
+    buffer[index] = char
+    fg_colours[index] = pack_colour(fg_colour)
+    bg_colours[index] = pack_colour(bg_colour)
 
-def write(
+
+def fill_colours(start: int, stop: int, step: int, fg_colour, bg_colour):
+    """Set the colours of the cells in a slice of the buffer."""
+    global cells_rendered
+
+    count = len(range(start, stop, step))
+    cells_rendered += count
+    fg_colours[start:stop:step] = array.array("l", [pack_colour(fg_colour)]) * count
+    bg_colours[start:stop:step] = array.array("l", [pack_colour(bg_colour)]) * count
+
+
+def write_span(
     x: int,
     y: int,
     text: str,
     fg_colour: tuple[int, int, int] | None = None,
     bg_colour: tuple[int, int, int] | None = None,
 ):
-    """Write the given text to the buffer at the given coordinate."""
+    """Write a line of text to the buffer at the given coordinate, cutting off anything outside of the screen."""
     # Make negative indices positive, since it makes negative x coordinates better
     # Otherwise, they warp across the right of the screen to the left
     while x < 0:
@@ -194,6 +558,199 @@ def write(
     while y < 0:
         y += height
 
-    # Write each character
-    for i, char in enumerate(str(text)):
-        set(x + i, y, char, fg_colour, bg_colour)
+    # Clamp once for the whole span
+    if y >= height or x >= width:
+        return
+
+    end_x = min(x + len(text), width)
+    text = text[: end_x - x]
+
+    # Control characters are skipped, so each character has to be written separately
+    if any(char in text for char in CONTROL_CHARS):
+        for i, char in enumerate(text):
+            set(x + i, y, char, fg_colour, bg_colour)
+        return
+
+    # Copy the whole span into the buffers at once
+    start = y * width + x
+    stop = start + len(text)
+    buffer[start:stop] = text
+    fill_colours(start, stop, 1, fg_colour, bg_colour)
+
+
+def fill_rect(
+    x: int,
+    y: int,
+    rect_width: int,
+    rect_height: int,
+    char: chr = " ",
+    fg_colour: tuple[int, int, int] | None = None,
+    bg_colour: tuple[int, int, int] | None = None,
+):
+    """Fill a rectangle of the buffer with the given character, cutting off anything outside of the screen."""
+    # Make negative indices positive, since they count from the right and bottom of the screen
+    if x < 0:
+        x += width
+
+    if y < 0:
+        y += height
+
+    # Clamp the rectangle to the screen
+    start_x = max(x, 0)
+    end_x = min(x + rect_width, width)
+    start_y = max(y, 0)
+    end_y = min(y + rect_height, height)
+    if start_x >= end_x or start_y >= end_y:
+        return
+
+    row = [char] * (end_x - start_x)
+    for row_y in range(start_y, end_y):
+        start = row_y * width + start_x
+        stop = row_y * width + end_x
+        buffer[start:stop] = row
+        fill_colours(start, stop, 1, fg_colour, bg_colour)
+
+
+def hline(
+    x: int,
+    y: int,
+    length: int,
+    char: chr = HORIZONTAL_BAR_CHAR,
+    fg_colour: tuple[int, int, int] | None = None,
+    bg_colour: tuple[int, int, int] | None = None,
+):
+    """Draw a horizontal line to the right of the given coordinate."""
+    fill_rect(x, y, length, 1, char, fg_colour, bg_colour)
+
+
+def vline(
+    x: int,
+    y: int,
+    length: int,
+    char: chr = VERTICAL_BAR_CHAR,
+    fg_colour: tuple[int, int, int] | None = None,
+    bg_colour: tuple[int, int, int] | None = None,
+):
+    """Draw a vertical line below the given coordinate."""
+    # Make negative indices positive, since they count from the right and bottom of the screen
+    if x < 0:
+        x += width
+
+    if y < 0:
+        y += height
+
+    # Clamp the line to the screen
+    start_y = max(y, 0)
+    end_y = min(y + length, height)
+    if x < 0 or x >= width or start_y >= end_y:
+        return
+
+    # The cells of a column are a whole row apart in the buffer
+    start = start_y * width + x
+    stop = (end_y - 1) * width + x + 1
+    buffer[start:stop:width] = [char] * (end_y - start_y)
+    fill_colours(start, stop, width, fg_colour, bg_colour)
+
+
+def box(
+    x: int,
+    y: int,
+    box_width: int,
+    box_height: int,
+    fg_colour: tuple[int, int, int] | None = None,
+    bg_colour: tuple[int, int, int] | None = None,
+):
+    """Draw a border around a rectangle of the buffer."""
+    # Make negative indices positive, so the far side of the box is in the right place
+    if x < 0:
+        x += width
+
+    if y < 0:
+        y += height
+
+    right = x + box_width - 1
+    bottom = y + box_height - 1
+
+    hline(x, y, box_width, HORIZONTAL_BAR_CHAR, fg_colour, bg_colour)
+    hline(x, bottom, box_width, HORIZONTAL_BAR_CHAR, fg_colour, bg_colour)
+    vline(x, y, box_height, VERTICAL_BAR_CHAR, fg_colour, bg_colour)
+    vline(right, y, box_height, VERTICAL_BAR_CHAR, fg_colour, bg_colour)
+
+    set(x, y, CORNER_BAR_CHARS[0], fg_colour, bg_colour)
+    set(right, y, CORNER_BAR_CHARS[1], fg_colour, bg_colour)
+    set(x, bottom, CORNER_BAR_CHARS[2], fg_colour, bg_colour)
+    set(right, bottom, CORNER_BAR_CHARS[3], fg_colour, bg_colour)
+
+
+def write(
+    x: int,
+    y: int,
+    text: str,
+    fg_colour: tuple[int, int, int] | None = None,
+    bg_colour: tuple[int, int, int] | None = None,
+):
+    """Write the given text to the buffer at the given coordinate."""
+    write_span(x, y, str(text), fg_colour, bg_colour)
+
+
+class Layer:
+    """A part of the screen that is drawn once, then copied into the buffer every frame until it changes."""
+
+    def __init__(self):
+        """Create an empty layer."""
+        self.key = None
+        # List of (StartIndex, Chars, FgColours, BgColours) for each run of cells that were drawn
+        self.runs = []
+
+    def draw(self, key, draw_callback: Callable[[], None]):
+        """Copy the layer into the buffer, redrawing it first if the key or the size of the console changed."""
+        key = (key, width, height)
+        if key != self.key:
+            self.key = key
+            self.capture(draw_callback)
+
+        for start, chars, fg_run, bg_run in self.runs:
+            stop = start + len(chars)
+            buffer[start:stop] = chars
+            fg_colours[start:stop] = fg_run
+            bg_colours[start:stop] = bg_run
+
+    def capture(self, draw_callback: Callable[[], None]):
+        """Draw the layer on its own and remember the cells that were drawn."""
+        global buffer
+        global fg_colours
+        global bg_colours
+
+        # Draw into separate buffers, so the cells that are left undrawn show what is underneath the layer
+        screen_buffers = (buffer, fg_colours, bg_colours)
+        buffer = [UNDRAWN_CHAR] * (width * height)
+        fg_colours = empty_colours[:]
+        bg_colours = empty_colours[:]
+        try:
+            draw_callback()
+            layer_buffers = (buffer, fg_colours, bg_colours)
+        finally:
+            (buffer, fg_colours, bg_colours) = screen_buffers
+
+        (layer_chars, layer_fg_colours, layer_bg_colours) = layer_buffers
+        undrawn_row = [UNDRAWN_CHAR] * width
+        self.runs = []
+        for y in range(height):
+            row_start = y * width
+            if layer_chars[row_start : row_start + width] == undrawn_row:
+                continue
+
+            x = 0
+            while x < width:
+                if layer_chars[row_start + x] == UNDRAWN_CHAR:
+                    x += 1
+                    continue
+
+                start_x = x
+                while x < width and layer_chars[row_start + x] != UNDRAWN_CHAR:
+                    x += 1
+
+                start = row_start + start_x
+                stop = row_start + x
+                run = (start, layer_chars[start:stop], layer_fg_colours[start:stop], layer_bg_colours[start:stop])
+                self.runs.append(run)
@@ -1,106 +1,608 @@
-"""The code related to managing the database."""
+"""The code related to managing the database.
 
+The connection is only ever used from a single database thread, so slow queries can run without freezing the UI.
+The public functions run on that thread, waiting for it if they are called from another thread,
+and run_async lets the event loop wait for them without blocking.
+"""
+
+import array
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import functools
+import itertools
+import re
 import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
 
-from mdb_movie import AudienceRating, Genre, Movie, MovieField
+import mdb_config as config
+import mdb_stats as stats
+from mdb_movie import AUDIENCE_RATINGS_BY_VALUE, GENRES_BY_DB_STRING, AudienceRating, Genre, Movie, MovieField
 
 MOVIES_TABLE = "MOVIES"
+MOVIE_GENRES_TABLE = "MOVIE_GENRES"
+MOVIES_SEARCH_TABLE = "MOVIES_SEARCH"
+
+# The movie fields that are stored in the movies table and can be searched, which each have an index
+# Genres are stored in their own table, which has its own index
+INDEXED_FIELDS = [
+    MovieField.NAME,
+    MovieField.RELEASE_YEAR,
+    MovieField.AUDIENCE_RATING,
+    MovieField.RUNTIME,
+    MovieField.STAR_RATING,
+    MovieField.WHERE_TO_WATCH,
+]
+
+# The movie fields that can be searched with the full text search table
+SEARCH_FIELDS = [MovieField.NAME, MovieField.WHERE_TO_WATCH]
+
+# The movie fields that the movies can be sorted by, which each have an index so sorting doesn't read every movie
+SORT_FIELDS = [MovieField.ID] + INDEXED_FIELDS
+
+# The movie fields that can be compared with ranges, such as greater than or between
+RANGE_FIELDS = [MovieField.RELEASE_YEAR, MovieField.RUNTIME, MovieField.STAR_RATING]
+
+# The comparison operators that can be used on the range fields, with the SQL that follows the column
+RANGE_OPERATORS = {"<": "< ?", "<=": "<= ?", ">": "> ?", ">=": ">= ?", "between": "BETWEEN ? AND ?"}
+
+# The default number of movies given to SQLite at once when inserting many movies
+BULK_INSERT_BATCH_SIZE = 1000
+
+# The default number of movies fetched from SQLite at once when iterating over every movie
+ITER_BATCH_SIZE = 1000
+
+# The number of IDs looked up by a single query, which stays well below SQLite's limit on the number of parameters
+GET_MANY_BATCH_SIZE = 500
+
+# The number of searches that have their results kept in memory
+SEARCH_CACHE_SIZE = 16
+
+# The columns used to construct a movie from a row
+# The genres are stored in their own table, so they are joined into the same format as the old genre column
+# They are joined in the order they were given, which is the order of the primary key so they don't need sorting
+MOVIE_COLUMNS = f"""ID, Name, ReleaseYear, AudienceRating, Runtime,
+        (SELECT GROUP_CONCAT(GenreID, ':') FROM (
+            SELECT GenreID FROM {MOVIE_GENRES_TABLE} WHERE MovieID = {MOVIES_TABLE}.ID ORDER BY Position
+        )) AS Genre,
+        StarRating, WhereToWatch"""
 
 database: sqlite3.Connection = None
 
+# The number of transactions that are currently open, since they can be nested
+transaction_depth = 0
+
+# The genres decoded from the database, keyed by their string in the database
+# There are only a few combinations of genres, so each one only needs to be decoded once
+decoded_genres = {}
+
+# Whether the linked SQLite supports FTS5, otherwise text is searched with LIKE
+search_table_available = False
+
+# Remembers whether the current thread is the database thread
+thread_state = threading.local()
+
+# The most recently read movies (or None if they don't exist) keyed by ID, with the least recently used first
+# Writes remove the movies they change, so it never holds anything different to the database
+movie_cache = collections.OrderedDict()
+movie_cache_hits = 0
+movie_cache_misses = 0
+
+# Increased whenever the movies change, so results that were cached before then can be recognised
+generation = 0
+
+# The IDs of the movies that matched recent searches in the order they are shown, keyed by the SQL of the search
+# Each one is stored as (Generation, IDs), so it is only used if the movies haven't changed since
+search_cache = collections.OrderedDict()
+search_cache_hits = 0
+search_cache_misses = 0
+
+
+class Filter:
+    """The parts of an SQL query used to filter and order the movies in the database."""
+
+    def __init__(
+        self, condition: str = "1", parameters: list | None = None, source: str = MOVIES_TABLE, order: str = "ID"
+    ):
+        """Create a filter from the SQL that is inserted into a query.
+
+        The parameters are in the order they appear in the source and then the condition.
+        """
+        self.condition = condition
+        self.parameters = parameters if parameters is not None else []
+        self.source = source
+        self.order = order
+
+
+def mark_database_thread():
+    """Remember that the current thread is the database thread."""
+    thread_state.is_database_thread = True
+
+
+# The database thread, which runs the work one function at a time in the order it is given
+executor = concurrent.futures.ThreadPoolExecutor(1, "mdb-database", mark_database_thread)
+
+
+def on_database_thread(function: Callable) -> Callable:
+    """Make a function always run on the database thread, waiting for it if it is called from another thread."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if getattr(thread_state, "is_database_thread", False):
+            # Only the outermost call is recorded, since it includes the time of the calls it makes
+            if not stats.enabled or getattr(thread_state, "statements", None) is not None:
+                return function(*args, **kwargs)
+
+            return call_with_stats(function, args, kwargs)
+
+        return executor.submit(wrapper, *args, **kwargs).result()
+
+    return wrapper
+
+
+def call_with_stats(function: Callable, args: tuple, kwargs: dict) -> any:
+    """Call a function on the database thread, recording how long it takes, the SQL it runs and the rows it returns."""
+    thread_state.statements = []
+    start_time = time.perf_counter()
+    result = None
+    try:
+        result = function(*args, **kwargs)
+        return result
+    finally:
+        seconds = time.perf_counter() - start_time
+        statements = thread_state.statements
+        thread_state.statements = None
+
+        # Single movies count as one row, while counts and other values aren't rows
+        if isinstance(result, (list, array.array)):
+            rows = len(result)
+        elif isinstance(result, Movie):
+            rows = 1
+        else:
+            rows = None
+
+        stats.record_query(function.__name__, seconds, statements, rows)
+
 
+def on_statement(statement: str):
+    """Remember an SQL statement run by the database function that is being recorded."""
+    # Statements run inside virtual tables (such as the search table) start with a comment, and aren't part of the app
+    statements = getattr(thread_state, "statements", None)
+    if statements is not None and not statement.startswith("--"):
+        statements.append(statement)
+
+
+async def run_async(function: Callable, *args) -> any:
+    """Run a function on the database thread, letting the event loop run other things until it finishes."""
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+def decode_genres(value: str | None) -> tuple[Genre, ...] | None:
+    """Decode the genres of a movie from the string they are selected as.
+
+    Movies with the same genres share the same tuple.
+    """
+    if value is None:
+        return None
+
+    genres = decoded_genres.get(value)
+    if genres is None:
+        genres = tuple(GENRES_BY_DB_STRING.get(genre) for genre in value.split(":"))
+        decoded_genres[value] = genres
+
+    return genres
+
+
+def movie_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Movie:
+    """Convert a row selected with MOVIE_COLUMNS into a movie."""
+    # There are only a few places to watch movies, so every movie shares the same strings for them
+    where_to_watch = row[7]
+    if where_to_watch is not None:
+        where_to_watch = sys.intern(where_to_watch)
+
+    return Movie(
+        row[0],
+        row[1],
+        row[2],
+        AUDIENCE_RATINGS_BY_VALUE.get(row[3]),
+        row[4],
+        decode_genres(row[5]),
+        row[6],
+        where_to_watch,
+    )
+
+
+def get_cache_key(id: int | str) -> int | None:
+    """Get the key of a movie ID in the movie cache, or None if it can't be cached.
+
+    IDs from commands are strings, which SQLite converts to integers, so only IDs made of digits are cached.
+    """
+    if isinstance(id, int):
+        return id
+
+    if isinstance(id, str) and id.isascii() and id.isdigit():
+        return int(id)
+
+    return None
+
+
+def get_cache_counters() -> dict:
+    """Get how often the caches were used and how much they hold."""
+    return {
+        "movie_cache_hits": movie_cache_hits,
+        "movie_cache_misses": movie_cache_misses,
+        "movie_cache_size": len(movie_cache),
+        "search_cache_hits": search_cache_hits,
+        "search_cache_misses": search_cache_misses,
+        "search_cache_size": len(search_cache),
+    }
+
+
+def on_movies_changed(ids: Iterable[int | str] | None = None):
+    """Forget the cached searches and the cached movies with the given IDs, or every movie if no IDs are given."""
+    global generation
+    generation += 1
+
+    if ids is None:
+        movie_cache.clear()
+        return
+
+    for id in ids:
+        key = get_cache_key(id)
+
+        # SQLite might still match an ID that isn't cached to a cached movie, such as "+1"
+        if key is None:
+            movie_cache.clear()
+            return
+
+        movie_cache.pop(key, None)
+
+
+@on_database_thread
+def select_movies(query: str, parameters: Iterable = ()) -> sqlite3.Cursor:
+    """Run a query that selects MOVIE_COLUMNS and return a cursor that produces movies."""
+    cursor = database.cursor()
+    cursor.row_factory = movie_row_factory
+    return cursor.execute(query, parameters)
+
+
+@on_database_thread
 def setup():
     """Set up the database utilities.
 
     Must be called before anything else in this file to guarantee proper functionality.
     """
     global database
+    global search_table_available
+
+    # Connect to the database, update it if it is from an older version, and add the initial data if it doesn"t exist
+    database = sqlite3.connect(config.database_path, timeout=config.busy_timeout / 1000)
+    if stats.enabled:
+        database.set_trace_callback(on_statement)
 
-    # Connect to the database and add the initial data if it doesn"t exist
-    database = sqlite3.connect("Database.db")
+    configure()
+    migrate()
     insert_initial_data()
 
+    search_table_available = table_exists(MOVIES_SEARCH_TABLE)
+
+
+@on_database_thread
+def close():
+    """Close the database, so setup can be called again with different settings."""
+    global database
+
+    database.close()
+    database = None
+    on_movies_changed()
+
+
+def configure():
+    """Apply the connection settings from the config to the database."""
+    # Pragmas can't use SQL parameters, so the values are validated first
+    if config.journal_mode is not None and config.journal_mode not in config.JOURNAL_MODES:
+        raise ValueError(f"Invalid journal mode: {config.journal_mode}")
+
+    if config.synchronous not in config.SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid synchronous mode: {config.synchronous}")
+
+    # WAL mode is stored in the database file, so the journal mode is only changed if it was asked for
+    if config.journal_mode is not None:
+        database.execute(f"PRAGMA journal_mode = {config.journal_mode};")
+
+    database.execute(f"PRAGMA synchronous = {config.synchronous};")
+    database.execute(f"PRAGMA cache_size = {int(config.cache_size)};")
+    database.execute(f"PRAGMA mmap_size = {int(config.mmap_size)};")
+    database.execute(f"PRAGMA busy_timeout = {int(config.busy_timeout)};")
+
+
+@contextlib.contextmanager
+def transaction(immediate: bool = False):
+    """Group all of the changes made inside a with statement into a single commit.
+
+    If an exception is raised, all of the changes are rolled back.
+    Transactions can be nested, in which case the inner ones use savepoints,
+    so they can be rolled back without undoing the changes of the outer ones.
+    An immediate transaction takes the write lock when it starts, so nothing else can write
+    between what it reads and what it writes. Nested transactions use the lock of the outer one.
+
+    The connection belongs to the database thread, so this can only be used there,
+    such as inside a function passed to run_in_transaction.
+    """
+    global transaction_depth
+
+    if not getattr(thread_state, "is_database_thread", False):
+        raise RuntimeError("Transactions can only be used on the database thread - Use run_in_transaction instead")
+
+    savepoint = f"transaction_{transaction_depth}"
+    if transaction_depth == 0:
+        database.execute("BEGIN IMMEDIATE;" if immediate else "BEGIN;")
+    else:
+        database.execute(f"SAVEPOINT {savepoint};")
+
+    transaction_depth += 1
+    try:
+        yield
+    except:
+        transaction_depth -= 1
+        if transaction_depth == 0:
+            database.rollback()
+        else:
+            database.execute(f"ROLLBACK TO {savepoint};")
+            database.execute(f"RELEASE {savepoint};")
+
+        raise
+
+    transaction_depth -= 1
+    if transaction_depth == 0:
+        database.commit()
+    else:
+        database.execute(f"RELEASE {savepoint};")
+
+
+@on_database_thread
+def run_in_transaction(function: Callable, *args, **kwargs) -> any:
+    """Call a function on the database thread inside a transaction, so all of its changes are a single commit."""
+    with transaction():
+        return function(*args, **kwargs)
+
+
+def table_exists(name: str) -> bool:
+    """Check if a table with the given name exists in the database."""
+    response = database.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (name,))
+    return response.fetchone() is not None
+
+
+def column_exists(table: str, name: str) -> bool:
+    """Check if the table has a column with the given name."""
+    response = database.execute(f"PRAGMA table_info({table});")
+    return any(row[1] == name for row in response.fetchall())
+
+
+def create_genre_table():
+    """Create the table that links movies to their genres, keeping the order the genres were given in."""
+    min_genre = Genre.ACTION.value
+    max_genre = Genre.SPORT.value
+
+    # Foreign keys aren't enforced, so the genres of a movie are deleted along with it by delete
+    database.execute(f"""
+    CREATE TABLE {MOVIE_GENRES_TABLE} (
+        MovieID INTEGER NOT NULL REFERENCES {MOVIES_TABLE}(ID),
+        Position INTEGER NOT NULL,
+        GenreID INTEGER NOT NULL CHECK(GenreID >= {min_genre} AND GenreID <= {max_genre}),
+        PRIMARY KEY (MovieID, Position)
+    ) WITHOUT ROWID;
+    """)
+
+    # The primary key covers looking up the genres of a movie, this covers looking up the movies of a genre
+    # It is unique, so a movie can't have the same genre twice
+    database.execute(
+        f"CREATE UNIQUE INDEX {MOVIE_GENRES_TABLE}_GENRE_INDEX ON {MOVIE_GENRES_TABLE} (GenreID, MovieID);"
+    )
+
+
+def create_indexes():
+    """Create the indexes for the searchable fields if they don't exist."""
+    for field in INDEXED_FIELDS:
+        column = field.database_name
+        database.execute(f"CREATE INDEX IF NOT EXISTS {MOVIES_TABLE}_{column}_INDEX ON {MOVIES_TABLE} ({column});")
+
+
+def create_search_table() -> bool:
+    """Create the full text search table for the text fields and return whether it was created.
+
+    It is kept in sync with the movies table using triggers.
+    It can't be created if the linked SQLite doesn't support FTS5.
+    """
+    columns = ", ".join(field.database_name for field in SEARCH_FIELDS)
+    new_columns = ", ".join(f"new.{field.database_name}" for field in SEARCH_FIELDS)
+    old_columns = ", ".join(f"old.{field.database_name}" for field in SEARCH_FIELDS)
+
+    try:
+        database.execute(f"""
+        CREATE VIRTUAL TABLE {MOVIES_SEARCH_TABLE} USING fts5(
+            {columns},
+            content='{MOVIES_TABLE}',
+            content_rowid='ID',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        """)
+    except sqlite3.OperationalError:
+        return False
+
+    insert_row = f"INSERT INTO {MOVIES_SEARCH_TABLE} (rowid, {columns}) VALUES (new.ID, {new_columns});"
+    delete_row = f"""INSERT INTO {MOVIES_SEARCH_TABLE} ({MOVIES_SEARCH_TABLE}, rowid, {columns})
+            VALUES ('delete', old.ID, {old_columns});"""
+
+    database.execute(f"""
+    CREATE TRIGGER {MOVIES_SEARCH_TABLE}_INSERT AFTER INSERT ON {MOVIES_TABLE} BEGIN
+        {insert_row}
+    END;
+    """)
+    database.execute(f"""
+    CREATE TRIGGER {MOVIES_SEARCH_TABLE}_DELETE AFTER DELETE ON {MOVIES_TABLE} BEGIN
+        {delete_row}
+    END;
+    """)
+    database.execute(f"""
+    CREATE TRIGGER {MOVIES_SEARCH_TABLE}_UPDATE AFTER UPDATE ON {MOVIES_TABLE} BEGIN
+        {delete_row}
+        {insert_row}
+    END;
+    """)
+
+    return True
+
+
+def migrate():
+    """Update a database created by an older version of the program."""
+    if not table_exists(MOVIES_TABLE):
+        return
+
+    with transaction():
+        # Older versions stored the genres as a colon separated string in the movies table
+        if not table_exists(MOVIE_GENRES_TABLE):
+            create_genre_table()
+
+            response = database.execute(f"SELECT ID, Genre FROM {MOVIES_TABLE} WHERE Genre IS NOT NULL;")
+            for movie_id, genres in response.fetchall():
+                genre_list = [genre for genre in Genre.list_from_str(genres) or [] if genre is not None]
+                insert_genres(movie_id, genre_list)
+
+            # Dropping columns isn't supported by older versions of SQLite, so just clear them instead
+            try:
+                database.execute(f"ALTER TABLE {MOVIES_TABLE} DROP COLUMN Genre;")
+            except sqlite3.OperationalError:
+                database.execute(f"UPDATE {MOVIES_TABLE} SET Genre = NULL;")
+
+        # Older versions didn't keep the order of the genres, so they are kept in the order of their IDs
+        if not column_exists(MOVIE_GENRES_TABLE, "Position"):
+            database.execute(f"DROP INDEX IF EXISTS {MOVIE_GENRES_TABLE}_GENRE_INDEX;")
+            database.execute(f"ALTER TABLE {MOVIE_GENRES_TABLE} RENAME TO {MOVIE_GENRES_TABLE}_OLD;")
+            create_genre_table()
+            database.execute(f"""
+            INSERT INTO {MOVIE_GENRES_TABLE} (MovieID, Position, GenreID)
+                SELECT MovieID, GenreID, GenreID FROM {MOVIE_GENRES_TABLE}_OLD;
+            """)
+            database.execute(f"DROP TABLE {MOVIE_GENRES_TABLE}_OLD;")
+
+        # Older versions didn't have indexes for the searchable fields
+        create_indexes()
+
+        # Older versions didn't have a full text search table, so it needs to be filled with the existing movies
+        if not table_exists(MOVIES_SEARCH_TABLE) and create_search_table():
+            database.execute(f"INSERT INTO {MOVIES_SEARCH_TABLE} ({MOVIES_SEARCH_TABLE}) VALUES ('rebuild');")
+
 
 def insert_initial_data():
     """Add the initial contents of the database if it doesn"t exist."""
     # Check if the table exists already
-    response = database.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{MOVIES_TABLE}';")
-    if len(response.fetchall()) > 0:
+    if table_exists(MOVIES_TABLE):
         return
 
-    # Create the table
-    min_ar = AudienceRating.G.value
-    max_ar = AudienceRating.NC18.value
-    database.execute(f"""
-    CREATE TABLE {MOVIES_TABLE} (
-        ID INTEGER PRIMARY KEY,
-        Name TEXT NOT NULL     CHECK(length(Name) > 0 AND length(Name) <= 100),
-        ReleaseYear INTEGER    CHECK(ReleaseYear >= 1800 AND ReleaseYear <= 2100),
-        AudienceRating INTEGER CHECK(AudienceRating >= {min_ar} AND AudienceRating <= {max_ar}),
-        Runtime INTEGER        CHECK(Runtime > 0 AND Runtime <= 600),
-        Genre TEXT,
-        StarRating INTEGER     CHECK(StarRating > 0 AND StarRating <= 5),
-        WhereToWatch TEXT      CHECK(length(WhereToWatch) <= 100)
-    );
-    """)
+    with transaction():
+        # Create the tables
+        min_ar = AudienceRating.G.value
+        max_ar = AudienceRating.NC18.value
+        database.execute(f"""
+        CREATE TABLE {MOVIES_TABLE} (
+            ID INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL     CHECK(length(Name) > 0 AND length(Name) <= 100),
+            ReleaseYear INTEGER    CHECK(ReleaseYear >= 1800 AND ReleaseYear <= 2100),
+            AudienceRating INTEGER CHECK(AudienceRating >= {min_ar} AND AudienceRating <= {max_ar}),
+            Runtime INTEGER        CHECK(Runtime > 0 AND Runtime <= 600),
+            StarRating INTEGER     CHECK(StarRating > 0 AND StarRating <= 5),
+            WhereToWatch TEXT      CHECK(length(WhereToWatch) <= 100)
+        );
+        """)
 
-    # Add the initial data
-    # Dummy IDs are used because they don't matter and are automatically assigned by the database
-    initial_movies = [
-        Movie(0, "Ghostbusters", 2016, AudienceRating.PG, 116, [Genre.COMEDY, Genre.HORROR], 4, "Netflix"),
-        Movie(0, "The Legend of Tarzan", 2016, AudienceRating.PG, 109, [Genre.ACTION, Genre.ADVENTURE], 3, "Hulu"),
-        Movie(0, "Jason Bourne", 2016, AudienceRating.PG, 123, [Genre.ACTION], 4, "Amazon Prime"),
-        Movie(0, "The Nice Guys", 2016, AudienceRating.R13, 116, [Genre.CRIME], 4, "HBO Max"),
-        Movie(0, "The Secret Life of Pets", 2016, AudienceRating.G, 91, [Genre.ANIMATION], 3, "Disney+"),
-        Movie(0, "Star Trek Beyond", 2016, AudienceRating.PG, 120, [Genre.ACTION], 4, "Paramount+"),
-        Movie(0, "Batman v Superman", 2016, AudienceRating.PG, 151, [Genre.ACTION], 3, "HBO Max"),
-        Movie(0, "Finding Dory", 2016, AudienceRating.G, 103, [Genre.ANIMATION], 4, "Disney+"),
-        Movie(0, "Zootopia", 2016, AudienceRating.G, 108, [Genre.ANIMATION], 5, "Disney+"),
-        Movie(0, "The BFG", 2016, AudienceRating.PG, 90, [Genre.FANTASY], 3, "Netflix"),
-        Movie(0, "A Monster Calls", 2016, AudienceRating.PG, 108, [Genre.FANTASY], 4, "Amazon Prime"),
-        Movie(0, "Independence Day: Resurgence", 2016, AudienceRating.PG, 120, [Genre.ACTION], 3, "HBO Max"),
-        Movie(0, "The Green Room", 2016, AudienceRating.R13, 94, [Genre.CRIME], 4, "Hulu"),
-        Movie(0, "Doctor Strange", 2016, AudienceRating.PG, 130, [Genre.FANTASY], 4, "Disney+"),
-        Movie(0, "The Jungle Book", 2016, AudienceRating.PG, 105, [Genre.FANTASY], 5, "Disney+"),
-        Movie(0, "Alice Through the Looking Glass", 2016, AudienceRating.PG, 118, [Genre.FANTASY], 3, "Disney+"),
-        Movie(0, "Imperium", 2016, AudienceRating.R13, 109, [Genre.CRIME], 4, "Hulu"),
-        Movie(0, "The Infiltrator", 2016, AudienceRating.R13, 127, [Genre.CRIME], 4, "Amazon Prime"),
-        Movie(0, "Mad Max: Fury Road", 2015, AudienceRating.R13, 120, [Genre.ACTION], 5, "HBO Max"),
-        Movie(0, "Spectre", 2015, AudienceRating.PG, 145, [Genre.ACTION], 4, "Amazon Prime"),
-        Movie(0, "Jurassic World", 2015, AudienceRating.PG, 100, [Genre.ACTION], 4, "Peacock"),
-        Movie(0, "The Intern", 2015, AudienceRating.PG, 121, [Genre.COMEDY], 3, "Netflix"),
-        Movie(0, "Ted 2", 2015, AudienceRating.R13, 121, [Genre.COMEDY], 3, "Amazon Prime"),
-        Movie(0, "Trainwreck", 2015, AudienceRating.R13, 122, [Genre.COMEDY], 3, "HBO Max"),
-        Movie(0, "Inside Out", 2015, AudienceRating.PG, 94, [Genre.ANIMATION], 5, "Disney+"),
-        Movie(0, "The Good Dinosaur", 2015, AudienceRating.G, 101, [Genre.ANIMATION], 4, "Disney+"),
-        Movie(0, "Divergent", 2014, AudienceRating.PG, 121, [Genre.ACTION], 3, "Netflix"),
-        Movie(0, "The Maze Runner", 2014, AudienceRating.PG, 115, [Genre.ACTION], 4, "Disney+"),
-        Movie(0, "Birdman", 2014, AudienceRating.R13, 119, [Genre.COMEDY], 4, "Hulu"),
-        Movie(0, "Guardians of the Galaxy", 2014, AudienceRating.PG, 121, [Genre.FANTASY], 5, "Disney+"),
-        Movie(0, "The Lego Movie", 2014, AudienceRating.PG, 100, [Genre.ANIMATION], 5, "Netflix"),
-        Movie(0, "Big Hero 6", 2014, AudienceRating.PG, 108, [Genre.ANIMATION], 5, "Disney+"),
-        Movie(0, "The Drop", 2014, AudienceRating.R13, 106, [Genre.CRIME], 4, "Hulu"),
-    ]
+        create_indexes()
+        create_genre_table()
+        create_search_table()
 
-    for movie in initial_movies:
-        insert(movie)
+        # Add the initial data
+        # Dummy IDs are used because they don't matter and are automatically assigned by the database
+        initial_movies = [
+            Movie(0, "Ghostbusters", 2016, AudienceRating.PG, 116, [Genre.COMEDY, Genre.HORROR], 4, "Netflix"),
+            Movie(0, "The Legend of Tarzan", 2016, AudienceRating.PG, 109, [Genre.ACTION, Genre.ADVENTURE], 3, "Hulu"),
+            Movie(0, "Jason Bourne", 2016, AudienceRating.PG, 123, [Genre.ACTION], 4, "Amazon Prime"),
+            Movie(0, "The Nice Guys", 2016, AudienceRating.R13, 116, [Genre.CRIME], 4, "HBO Max"),
+            Movie(0, "The Secret Life of Pets", 2016, AudienceRating.G, 91, [Genre.ANIMATION], 3, "Disney+"),
+            Movie(0, "Star Trek Beyond", 2016, AudienceRating.PG, 120, [Genre.ACTION], 4, "Paramount+"),
+            Movie(0, "Batman v Superman", 2016, AudienceRating.PG, 151, [Genre.ACTION], 3, "HBO Max"),
+            Movie(0, "Finding Dory", 2016, AudienceRating.G, 103, [Genre.ANIMATION], 4, "Disney+"),
+            Movie(0, "Zootopia", 2016, AudienceRating.G, 108, [Genre.ANIMATION], 5, "Disney+"),
+            Movie(0, "The BFG", 2016, AudienceRating.PG, 90, [Genre.FANTASY], 3, "Netflix"),
+            Movie(0, "A Monster Calls", 2016, AudienceRating.PG, 108, [Genre.FANTASY], 4, "Amazon Prime"),
+            Movie(0, "Independence Day: Resurgence", 2016, AudienceRating.PG, 120, [Genre.ACTION], 3, "HBO Max"),
+            Movie(0, "The Green Room", 2016, AudienceRating.R13, 94, [Genre.CRIME], 4, "Hulu"),
+            Movie(0, "Doctor Strange", 2016, AudienceRating.PG, 130, [Genre.FANTASY], 4, "Disney+"),
+            Movie(0, "The Jungle Book", 2016, AudienceRating.PG, 105, [Genre.FANTASY], 5, "Disney+"),
+            Movie(0, "Alice Through the Looking Glass", 2016, AudienceRating.PG, 118, [Genre.FANTASY], 3, "Disney+"),
+            Movie(0, "Imperium", 2016, AudienceRating.R13, 109, [Genre.CRIME], 4, "Hulu"),
+            Movie(0, "The Infiltrator", 2016, AudienceRating.R13, 127, [Genre.CRIME], 4, "Amazon Prime"),
+            Movie(0, "Mad Max: Fury Road", 2015, AudienceRating.R13, 120, [Genre.ACTION], 5, "HBO Max"),
+            Movie(0, "Spectre", 2015, AudienceRating.PG, 145, [Genre.ACTION], 4, "Amazon Prime"),
+            Movie(0, "Jurassic World", 2015, AudienceRating.PG, 100, [Genre.ACTION], 4, "Peacock"),
+            Movie(0, "The Intern", 2015, AudienceRating.PG, 121, [Genre.COMEDY], 3, "Netflix"),
+            Movie(0, "Ted 2", 2015, AudienceRating.R13, 121, [Genre.COMEDY], 3, "Amazon Prime"),
+            Movie(0, "Trainwreck", 2015, AudienceRating.R13, 122, [Genre.COMEDY], 3, "HBO Max"),
+            Movie(0, "Inside Out", 2015, AudienceRating.PG, 94, [Genre.ANIMATION], 5, "Disney+"),
+            Movie(0, "The Good Dinosaur", 2015, AudienceRating.G, 101, [Genre.ANIMATION], 4, "Disney+"),
+            Movie(0, "Divergent", 2014, AudienceRating.PG, 121, [Genre.ACTION], 3, "Netflix"),
+            Movie(0, "The Maze Runner", 2014, AudienceRating.PG, 115, [Genre.ACTION], 4, "Disney+"),
+            Movie(0, "Birdman", 2014, AudienceRating.R13, 119, [Genre.COMEDY], 4, "Hulu"),
+            Movie(0, "Guardians of the Galaxy", 2014, AudienceRating.PG, 121, [Genre.FANTASY], 5, "Disney+"),
+            Movie(0, "The Lego Movie", 2014, AudienceRating.PG, 100, [Genre.ANIMATION], 5, "Netflix"),
+            Movie(0, "Big Hero 6", 2014, AudienceRating.PG, 108, [Genre.ANIMATION], 5, "Disney+"),
+            Movie(0, "The Drop", 2014, AudienceRating.R13, 106, [Genre.CRIME], 4, "Hulu"),
+        ]
 
+        for movie in initial_movies:
+            insert(movie)
 
+
+@on_database_thread
 def reset():
     """Reset the database."""
-    # Delete the data and recreate the database
-    database.execute(f"DROP TABLE IF EXISTS {MOVIES_TABLE};")
-    database.commit()
+    # Delete the data and recreate the database, which is done in one transaction so it is never left half reset
+    with transaction():
+        database.execute(f"DROP TABLE IF EXISTS {MOVIES_SEARCH_TABLE};")
+        database.execute(f"DROP TABLE IF EXISTS {MOVIE_GENRES_TABLE};")
+        database.execute(f"DROP TABLE IF EXISTS {MOVIES_TABLE};")
 
-    insert_initial_data()
+        insert_initial_data()
+
+    on_movies_changed()
+
+
+def insert_genres(movie_id: int, genres: tuple[Genre, ...] | list[Genre] | None):
+    """Link the given genres to the movie with the given ID.
+
+    This should be used inside a transaction, since it is always part of a larger change.
+    """
+    if genres is None:
+        return
+
+    # Ignore duplicate genres, since each genre can only be linked to a movie once
+    database.executemany(
+        f"INSERT OR IGNORE INTO {MOVIE_GENRES_TABLE} (MovieID, Position, GenreID) VALUES (?, ?, ?);",
+        [(movie_id, position, genre.value) for position, genre in enumerate(genres)],
+    )
 
 
+@on_database_thread
 def insert(movie: Movie) -> int:
     """Add an entry to the database and return the ID of the entry."""
     # According to ChatGPT, this is safer than using python string interpolation
     query = f"""
-    INSERT INTO {MOVIES_TABLE} (Name, ReleaseYear, AudienceRating, Runtime, Genre, StarRating, WhereToWatch) VALUES
-        (?, ?, ?, ?, ?, ?, ?);
+    INSERT INTO {MOVIES_TABLE} (Name, ReleaseYear, AudienceRating, Runtime, StarRating, WhereToWatch) VALUES
+        (?, ?, ?, ?, ?, ?);
     """
 
     parameters = (
@@ -108,18 +610,95 @@ def insert(movie: Movie) -> int:
         movie.release_year,
         movie.audience_rating_db,
         movie.runtime,
-        movie.genre_db,
         movie.star_rating,
         movie.where_to_watch,
     )
 
-    cursor = database.cursor()
-    cursor.execute(query, parameters)
-    database.commit()
+    with transaction():
+        cursor = database.cursor()
+        cursor.execute(query, parameters)
+        insert_genres(cursor.lastrowid, movie.genre)
 
+    # The ID might have been read before the movie existed
+    on_movies_changed([cursor.lastrowid])
     return cursor.lastrowid
 
 
+@on_database_thread
+def bulk_insert(
+    movies: Iterable[Movie],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    on_reject: Callable[[Movie, str], None] | None = None,
+) -> int:
+    """Add many entries to the database in a single transaction and return how many were added.
+
+    The movies are consumed lazily in batches, so they can be streamed from a file.
+    Movies that the database rejects are skipped and passed to on_reject with the reason.
+    """
+    movie_query = f"""
+    INSERT INTO {MOVIES_TABLE} (ID, Name, ReleaseYear, AudienceRating, Runtime, StarRating, WhereToWatch) VALUES
+        (?, ?, ?, ?, ?, ?, ?);
+    """
+    genre_query = f"INSERT OR IGNORE INTO {MOVIE_GENRES_TABLE} (MovieID, Position, GenreID) VALUES (?, ?, ?);"
+
+    inserted = 0
+
+    with transaction(immediate=True):
+        # The IDs are assigned here instead of by the database, since the genres need them
+        # They are read inside the transaction, so another connection can't add movies with the same IDs first
+        next_id = database.execute(f"SELECT COALESCE(MAX(ID), 0) + 1 FROM {MOVIES_TABLE};").fetchone()[0]
+
+        movies = iter(movies)
+        while True:
+            batch = list(itertools.islice(movies, batch_size))
+            if len(batch) <= 0:
+                break
+
+            movie_rows = []
+            genre_rows = []
+            for movie in batch:
+                movie_rows.append(
+                    (
+                        next_id,
+                        movie.name,
+                        movie.release_year,
+                        movie.audience_rating_db,
+                        movie.runtime,
+                        movie.star_rating,
+                        movie.where_to_watch,
+                    )
+                )
+
+                for position, genre in enumerate(movie.genre or []):
+                    genre_rows.append((next_id, position, genre.value))
+
+                next_id += 1
+
+            # A nested transaction lets a batch with an invalid movie be undone and inserted one movie at a time instead
+            try:
+                with transaction():
+                    database.executemany(movie_query, movie_rows)
+                    database.executemany(genre_query, genre_rows)
+
+                inserted += len(batch)
+            except sqlite3.IntegrityError:
+                for movie, movie_row in zip(batch, movie_rows):
+                    try:
+                        database.execute(movie_query, movie_row)
+                    except sqlite3.IntegrityError as error:
+                        if on_reject is not None:
+                            on_reject(movie, str(error))
+                        continue
+
+                    insert_genres(movie_row[0], movie.genre)
+                    inserted += 1
+
+    # Any of the new IDs might have been read before the movies existed
+    on_movies_changed()
+    return inserted
+
+
+@on_database_thread
 def edit(new_movie: Movie):
     """Edit an entry from the database by updating all of the fields using the given movie."""
     query = f"""
@@ -128,7 +707,6 @@ def edit(new_movie: Movie):
         ReleaseYear = ?,
         AudienceRating = ?,
         Runtime = ?,
-        Genre = ?,
         StarRating = ?,
         WhereToWatch = ?
     WHERE ID = ?;
@@ -139,118 +717,447 @@ def edit(new_movie: Movie):
         new_movie.release_year,
         new_movie.audience_rating_db,
         new_movie.runtime,
-        new_movie.genre_db,
         new_movie.star_rating,
         new_movie.where_to_watch,
         new_movie.id,
     )
 
-    database.execute(query, parameters)
-    database.commit()
+    with transaction():
+        database.execute(query, parameters)
+
+        # Replace the genres
+        database.execute(f"DELETE FROM {MOVIE_GENRES_TABLE} WHERE MovieID = ?;", (new_movie.id,))
+        insert_genres(new_movie.id, new_movie.genre)
 
+    on_movies_changed([new_movie.id])
 
+
+@on_database_thread
 def delete(id: int):
     """Delete an entry from the database via ID."""
-    database.execute(f"DELETE FROM {MOVIES_TABLE} WHERE ID = ?;", (id,))
-    database.commit()
+    with transaction():
+        database.execute(f"DELETE FROM {MOVIE_GENRES_TABLE} WHERE MovieID = ?;", (id,))
+        database.execute(f"DELETE FROM {MOVIES_TABLE} WHERE ID = ?;", (id,))
+
+    on_movies_changed([id])
 
 
+@on_database_thread
 def get(id: int) -> Movie:
-    """Get an entry from the database via ID."""
-    movie = database.execute(
+    """Get an entry from the database via ID.
+
+    Recently read entries are kept in memory, so reading the same one again doesn't need to query the database.
+    """
+    global movie_cache_hits
+    global movie_cache_misses
+
+    key = get_cache_key(id)
+    if key is not None and key in movie_cache:
+        movie_cache_hits += 1
+        movie_cache.move_to_end(key)
+        return copy.copy(movie_cache[key])
+
+    response = select_movies(
         f"""
-    SELECT ID, Name, ReleaseYear, AudienceRating, Runtime, Genre, StarRating, WhereToWatch
+    SELECT {MOVIE_COLUMNS}
         FROM {MOVIES_TABLE} WHERE ID = ?;
     """,
         (id,),
-    ).fetchone()
+    )
+    movie = response.fetchone()
 
-    if movie is None:
-        return None
+    if key is not None:
+        movie_cache_misses += 1
+        cache_movie(key, movie)
+
+    # Give out a copy, so changing the movie doesn't change the cache
+    return copy.copy(movie)
+
+
+def cache_movie(key: int, movie: Movie | None):
+    """Add a movie to the movie cache, removing the least recently used one if it is full."""
+    if config.movie_cache_size <= 0:
+        return
+
+    movie_cache[key] = movie
+    if len(movie_cache) > config.movie_cache_size:
+        movie_cache.popitem(last=False)
 
-    return Movie(
-        movie[0],
-        movie[1],
-        movie[2],
-        AudienceRating.from_int(movie[3]),
-        movie[4],
-        Genre.list_from_str(movie[5]),
-        movie[6],
-        movie[7],
-    )
 
+@on_database_thread
+def get_many(ids: Sequence[int]) -> list[Movie]:
+    """Get the entries with the given IDs in the same order, skipping any that don't exist.
 
+    Entries in the movie cache are used instead of querying the database.
+    """
+    global movie_cache_hits
+    global movie_cache_misses
+
+    movies = {}
+    missing_ids = []
+    for id in ids:
+        if id in movie_cache:
+            movie_cache_hits += 1
+            movie_cache.move_to_end(id)
+            movies[id] = copy.copy(movie_cache[id])
+        else:
+            movie_cache_misses += 1
+            missing_ids.append(id)
+
+    for start in range(0, len(missing_ids), GET_MANY_BATCH_SIZE):
+        batch = missing_ids[start : start + GET_MANY_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        response = select_movies(
+            f"""
+        SELECT {MOVIE_COLUMNS}
+            FROM {MOVIES_TABLE} WHERE ID IN ({placeholders});
+        """,
+            batch,
+        )
+
+        for movie in response:
+            cache_movie(movie.id, movie)
+            movies[movie.id] = copy.copy(movie)
+
+    return [movies[id] for id in ids if id in movies]
+
+
+@on_database_thread
 def get_all() -> list[Movie]:
     """Get all entries from the database."""
-    response = database.execute(f"""
-    SELECT ID, Name, ReleaseYear, AudienceRating, Runtime, Genre, StarRating, WhereToWatch
+    response = select_movies(f"""
+    SELECT {MOVIE_COLUMNS}
         FROM {MOVIES_TABLE};
     """)
 
-    return [
-        Movie(
-            movie[0],
-            movie[1],
-            movie[2],
-            AudienceRating.from_int(movie[3]),
-            movie[4],
-            Genre.list_from_str(movie[5]),
-            movie[6],
-            movie[7],
-        )
-        for movie in response
-    ]
+    return response.fetchall()
+
+
+def iter_all(batch_size: int = ITER_BATCH_SIZE) -> Iterator[Movie]:
+    """Iterate over all entries from the database in order of ID.
+
+    Only one batch of entries is held in memory at a time.
+    """
+    response = select_movies(f"""
+    SELECT {MOVIE_COLUMNS}
+        FROM {MOVIES_TABLE}
+        ORDER BY ID;
+    """)
+
+    while True:
+        batch = fetch_batch(response, batch_size)
+        if len(batch) <= 0:
+            break
 
+        yield from batch
 
+
+@on_database_thread
+def fetch_batch(cursor: sqlite3.Cursor, batch_size: int) -> list:
+    """Fetch the next batch of rows from a cursor, which has to happen on the database thread."""
+    return cursor.fetchmany(batch_size)
+
+
+@on_database_thread
 def get_filter(field: MovieField, query: any) -> list[Movie]:
     """Get all entries from the database with a filter."""
+    sql_filter = get_filter_sql(field, query)
+
+    response = select_movies(
+        f"""
+    SELECT {MOVIE_COLUMNS}
+        FROM {sql_filter.source}
+        WHERE {sql_filter.condition}
+        ORDER BY {sql_filter.order};
+    """,
+        sql_filter.parameters,
+    )
+
+    return response.fetchall()
+
+
+def get_search_expression(field: MovieField, query: str) -> str | None:
+    """Get an FTS5 expression that matches the words in the query as prefixes in the given field.
+
+    Returns None if the query doesn't contain any words that can be searched for.
+    """
+    # Only use letters and numbers, since the tokenizer treats everything else as a separator
+    # The tokenizer ignores case, so the words are lower case to make the same searches have the same expression
+    words = re.findall(r"[^\W_]+", query.lower())
+    if len(words) <= 0:
+        return None
+
+    return " AND ".join(f'{field.database_name} : "{word}"*' for word in words)
+
+
+def get_filter_sql(field: MovieField | None, query: any) -> Filter:
+    """Get the SQL for filtering the given field by the given query.
+
+    The filter matches everything if no field is given.
+    """
+    if field is None:
+        return Filter()
+
     # Enums would otherwise compare the string query to an int in the database
     if field == MovieField.AUDIENCE_RATING:
         query = query.value
 
-    # Construct the filter
-    use_sql_params = True
-    if field in [MovieField.NAME, MovieField.WHERE_TO_WATCH]:
+    if field in SEARCH_FIELDS:
+        # Use the full text search table if possible, which orders the movies by how well they match
+        expression = get_search_expression(field, query) if search_table_available else None
+        if expression is not None:
+            source = f"""{MOVIES_TABLE} JOIN (
+            SELECT rowid AS MatchID, rank AS MatchRank FROM {MOVIES_SEARCH_TABLE} WHERE {MOVIES_SEARCH_TABLE} MATCH ?
+        ) ON MatchID = ID"""
+            return Filter(parameters=[expression], source=source, order="MatchRank, ID")
+
         # Only compare certain fields by text comparison
-        sql_filter = f"WHERE RTRIM({field.database_name}) LIKE '%' || RTRIM(?) || '%' COLLATE NOCASE"
-    elif field == MovieField.GENRE:
-        # Calculate the filters
-        filters = []
-        for genre in query:
-            # :0:, :0, and 0: because the first and last genres don't have trailing/leading colons
-            # Also need an equals in case it is the only genre
-            g = genre.value
-            patterns = [f"LIKE '%:{g}'", f"LIKE '{g}:%'", f"LIKE '%:{g}:%'", f"= '{g}'"]
-
-            for pattern in patterns:
-                filters.append(f"{field.database_name} {pattern}")
-
-        sql_filter = "WHERE " + " OR ".join(filters) + " COLLATE NOCASE"
-        use_sql_params = False
-    else:
-        sql_filter = f"WHERE {field.database_name} = ?"
+        return Filter(f"RTRIM({field.database_name}) LIKE '%' || RTRIM(?) || '%' COLLATE NOCASE", [query])
 
-    sql_query = f"""
-    SELECT ID, Name, ReleaseYear, AudienceRating, Runtime, Genre, StarRating, WhereToWatch
-        FROM {MOVIES_TABLE}
-        {sql_filter};
+    if field == MovieField.GENRE:
+        # Look up the movies with any of the genres using the genre index
+        # The order and repeats of the genres don't matter, so they are sorted to make the same searches the same SQL
+        genre_ids = sorted({genre.value for genre in query})
+        placeholders = ", ".join("?" for _ in genre_ids)
+        condition = f"ID IN (SELECT MovieID FROM {MOVIE_GENRES_TABLE} WHERE GenreID IN ({placeholders}))"
+        return Filter(condition, genre_ids)
+
+    return Filter(f"{field.database_name} = ?", [query])
+
+
+def get_comparison_sql(field: MovieField, operator: str, values: list) -> Filter:
+    """Get the SQL condition for comparing a field to the values, which can be combined with other conditions.
+
+    The operator is either "=", which works like get_filter_sql, or one of the range operators.
+    Unlike get_filter_sql, it only ever filters the movies table, so text is matched in a subquery.
     """
+    if operator != "=":
+        if field not in RANGE_FIELDS or operator not in RANGE_OPERATORS:
+            raise ValueError(f"Can't compare {field} with '{operator}'")
 
-    if use_sql_params:
-        response = database.execute(sql_query, (query,))
-    else:
-        response = database.execute(sql_query)
+        return Filter(f"{field.database_name} {RANGE_OPERATORS[operator]}", list(values))
+
+    query = values[0]
+    if field in SEARCH_FIELDS:
+        expression = get_search_expression(field, query) if search_table_available else None
+        if expression is not None:
+            condition = f"ID IN (SELECT rowid FROM {MOVIES_SEARCH_TABLE} WHERE {MOVIES_SEARCH_TABLE} MATCH ?)"
+            return Filter(condition, [expression])
+
+    return get_filter_sql(field, query)
+
+
+@on_database_thread
+def get_query_plan(field: MovieField | None, query: any) -> list[str]:
+    """Get the steps SQLite takes to filter the given field by the given query, which shows which indexes are used."""
+    return get_filter_plan(get_filter_sql(field, query))
+
+
+@on_database_thread
+def get_filter_plan(sql_filter: Filter) -> list[str]:
+    """Get the steps SQLite takes to run the given filter, which shows which indexes are used."""
+    response = database.execute(
+        f"""
+    EXPLAIN QUERY PLAN SELECT {MOVIE_COLUMNS}
+        FROM {sql_filter.source}
+        WHERE {sql_filter.condition}
+        ORDER BY {sql_filter.order};
+    """,
+        sql_filter.parameters,
+    )
+
+    # Each row is (ID, ParentID, Unused, Description)
+    return [step[3] for step in response]
+
+
+@on_database_thread
+def count(field: MovieField | None = None, query: any = None) -> int:
+    """Get the number of entries in the database, optionally with a filter."""
+    sql_filter = get_filter_sql(field, query)
+    sql_query = f"SELECT COUNT(*) FROM {sql_filter.source} WHERE {sql_filter.condition};"
+    return database.execute(sql_query, sql_filter.parameters).fetchone()[0]
+
+
+def get_sort_sql(sort_field: MovieField, descending: bool = False) -> str:
+    """Get the SQL for ordering the movies by a field, with the ID breaking ties so the order is always the same.
+
+    This matches the order of the field's index, so SQLite can read the movies in order instead of sorting them.
+    Like in SQLite, movies without a value come first in ascending order and last in descending order.
+    """
+    if sort_field not in SORT_FIELDS:
+        raise ValueError(f"Can't sort by {sort_field}")
+
+    direction = " DESC" if descending else ""
+    if sort_field == MovieField.ID:
+        return f"ID{direction}"
+
+    return f"{sort_field.database_name}{direction}, ID{direction}"
+
+
+def sort_filter(sql_filter: Filter, sort_field: MovieField | None, descending: bool = False) -> Filter:
+    """Get a copy of a filter that orders the movies by a field, or the filter itself if no field is given."""
+    if sort_field is None:
+        return sql_filter
+
+    return Filter(sql_filter.condition, sql_filter.parameters, sql_filter.source, get_sort_sql(sort_field, descending))
+
+
+def get_sort_value(movie: Movie, sort_field: MovieField) -> any:
+    """Get the value of a movie that it is sorted by, in the same form as it is stored in the database."""
+    match sort_field:
+        case MovieField.ID:
+            return movie.id
+        case MovieField.NAME:
+            return movie.name
+        case MovieField.RELEASE_YEAR:
+            return movie.release_year
+        case MovieField.AUDIENCE_RATING:
+            return movie.audience_rating_db
+        case MovieField.RUNTIME:
+            return movie.runtime
+        case MovieField.STAR_RATING:
+            return movie.star_rating
+        case MovieField.WHERE_TO_WATCH:
+            return movie.where_to_watch
+        case _:
+            raise ValueError(f"Can't sort by {sort_field}")
+
+
+def get_keyset_conditions(after: Movie, sort_field: MovieField, descending: bool) -> list[tuple[str, list]]:
+    """Get the conditions that select the movies after the given one when sorted by a field.
+
+    The movies after it are split into parts which come one after another, such as the movies with the same value
+    and a later ID and then the movies with a later value, so each part only needs a single index lookup.
+    Returns a list of (Condition, Parameters) in the order the parts are shown.
+    """
+    if sort_field == MovieField.ID:
+        return [("ID < ?" if descending else "ID > ?", [after.id])]
+
+    column = sort_field.database_name
+    value = get_sort_value(after, sort_field)
+
+    # Movies without a value come first in ascending order, so every movie with a value comes after them
+    if not descending:
+        if value is None:
+            return [(f"{column} IS NULL AND ID > ?", [after.id]), (f"{column} IS NOT NULL", [])]
+
+        return [(f"{column} = ? AND ID > ?", [value, after.id]), (f"{column} > ?", [value])]
+
+    # Movies without a value come last in descending order, after every movie with a value
+    if value is None:
+        return [(f"{column} IS NULL AND ID < ?", [after.id])]
 
     return [
-        Movie(
-            movie[0],
-            movie[1],
-            movie[2],
-            AudienceRating.from_int(movie[3]),
-            movie[4],
-            Genre.list_from_str(movie[5]),
-            movie[6],
-            movie[7],
-        )
-        for movie in response
+        (f"{column} = ? AND ID < ?", [value, after.id]),
+        (f"{column} < ?", [value]),
+        (f"{column} IS NULL", []),
     ]
+
+
+@on_database_thread
+def get_page(
+    after: Movie | None,
+    limit: int,
+    offset: int = 0,
+    field: MovieField | None = None,
+    query: any = None,
+    sort_field: MovieField | None = None,
+    descending: bool = False,
+) -> list[Movie]:
+    """Get a page of entries from the database, optionally with a filter and sorted by a field.
+
+    If the entry before the page is given and the entries are ordered by ID or a sort field,
+    the page starts after that entry, which only needs an index lookup no matter how far into the list it is.
+    Otherwise, the page starts after skipping the first offset entries.
+    """
+    sql_filter = sort_filter(get_filter_sql(field, query), sort_field, descending)
+
+    if sort_field is None and sql_filter.order == "ID":
+        sort_field = MovieField.ID
+
+    if after is None or sort_field is None:
+        response = select_movies(
+            f"""
+        SELECT {MOVIE_COLUMNS}
+            FROM {sql_filter.source}
+            WHERE {sql_filter.condition}
+            ORDER BY {sql_filter.order}
+            LIMIT ? OFFSET ?;
+        """,
+            (*sql_filter.parameters, limit, offset),
+        )
+
+        return response.fetchall()
+
+    # Read each part of the movies after the given one until the page is full
+    movies = []
+    for condition, parameters in get_keyset_conditions(after, sort_field, descending):
+        response = select_movies(
+            f"""
+        SELECT {MOVIE_COLUMNS}
+            FROM {sql_filter.source}
+            WHERE ({sql_filter.condition}) AND {condition}
+            ORDER BY {sql_filter.order}
+            LIMIT ?;
+        """,
+            (*sql_filter.parameters, *parameters, limit - len(movies)),
+        )
+
+        movies += response.fetchall()
+        if len(movies) >= limit:
+            break
+
+    return movies
+
+
+@on_database_thread
+def get_ids(
+    field: MovieField | None = None, query: any = None, sort_field: MovieField | None = None, descending: bool = False
+) -> array.array:
+    """Get the IDs of the entries in the database in the order they are shown, optionally with a filter.
+
+    They are in the filter's own order (such as how well they match a search) unless a sort field is given.
+    The IDs are kept in memory until the movies change, so repeating a search (such as when scrolling) is free.
+    The returned IDs are shared, so they must not be changed.
+    """
+    return get_filter_ids(sort_filter(get_filter_sql(field, query), sort_field, descending))
+
+
+@on_database_thread
+def get_filter_ids(sql_filter: Filter) -> array.array:
+    """Get the IDs of the entries that match the given filter in the order they are shown.
+
+    Like get_ids, the IDs are kept in memory until the movies change and must not be changed.
+    """
+    global search_cache_hits
+    global search_cache_misses
+
+    # The SQL is used as the key, since it is the same for searches that always give the same results
+    key = (sql_filter.source, sql_filter.condition, sql_filter.order, tuple(sql_filter.parameters))
+
+    cached = search_cache.get(key)
+    if cached is not None and cached[0] == generation:
+        search_cache_hits += 1
+        search_cache.move_to_end(key)
+        return cached[1]
+
+    search_cache_misses += 1
+    response = database.execute(
+        f"""
+    SELECT ID
+        FROM {sql_filter.source}
+        WHERE {sql_filter.condition}
+        ORDER BY {sql_filter.order};
+    """,
+        sql_filter.parameters,
+    )
+
+    # An array of ints is much smaller than a list, which matters for searches that match most of the movies
+    ids = array.array("q", (row[0] for row in response))
+
+    search_cache[key] = (generation, ids)
+    search_cache.move_to_end(key)
+    if len(search_cache) > SEARCH_CACHE_SIZE:
+        search_cache.popitem(last=False)
+
+    return ids
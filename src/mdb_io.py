@@ -0,0 +1,284 @@
+"""The code related to importing movies from files and exporting them to files.
+
+Files are either CSV, with a header row of movie field names, or JSON lines, with one object per line.
+Both are read and written one row at a time, so large catalogues never have to fit in memory.
+"""
+
+import csv
+import functools
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+
+import mdb_database as db
+from mdb_movie import Movie, MovieField
+
+CSV_FORMAT = "csv"
+JSONL_FORMAT = "jsonl"
+
+# The file extensions of each format
+# Plain .json files hold a single value rather than one object per line, so they can't be streamed like the others
+FORMAT_EXTENSIONS = {
+    ".csv": CSV_FORMAT,
+    ".jsonl": JSONL_FORMAT,
+    ".ndjson": JSONL_FORMAT,
+}
+
+# The formats that can be exported to
+FORMATS = [CSV_FORMAT, JSONL_FORMAT]
+
+# The fields of a movie in the order they are given to the constructor
+MOVIE_FIELDS = [
+    MovieField.NAME,
+    MovieField.RELEASE_YEAR,
+    MovieField.AUDIENCE_RATING,
+    MovieField.RUNTIME,
+    MovieField.GENRE,
+    MovieField.STAR_RATING,
+    MovieField.WHERE_TO_WATCH,
+]
+
+# The number of rejected rows that are remembered so they can be shown to the user
+MAX_REJECTIONS_KEPT = 100
+
+
+class ImportResult:
+    """The outcome of importing a file."""
+
+    def __init__(self, path: str):
+        """Create an empty result for the given file."""
+        self.path = path
+        self.imported = 0
+        self.rejected = 0
+        # List of (RowNumber | None, ErrorMessage), only holding the first few rejections
+        self.rejections = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """The number of rows that were imported per second."""
+        if self.seconds <= 0:
+            return 0.0
+
+        return self.imported / self.seconds
+
+    def reject(self, row_number: int | None, message: str):
+        """Record that a row was rejected."""
+        self.rejected += 1
+        if len(self.rejections) < MAX_REJECTIONS_KEPT:
+            self.rejections.append((row_number, message))
+
+    def to_dict(self) -> dict:
+        """Convert the result into a dictionary that can be written as JSON."""
+        return {
+            "path": self.path,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "rejections": [{"row": row_number, "message": message} for row_number, message in self.rejections],
+            "seconds": self.seconds,
+        }
+
+
+class ExportResult:
+    """The outcome of exporting to a file."""
+
+    def __init__(self, path: str, file_format: str):
+        """Create an empty result for the given file."""
+        self.path = path
+        self.file_format = file_format
+        self.exported = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """The number of rows that were exported per second."""
+        if self.seconds <= 0:
+            return 0.0
+
+        return self.exported / self.seconds
+
+    def to_dict(self) -> dict:
+        """Convert the result into a dictionary that can be written as JSON."""
+        return {"path": self.path, "format": self.file_format, "exported": self.exported, "seconds": self.seconds}
+
+
+def get_format(path: str) -> str | None:
+    """Get the format of a file from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    return FORMAT_EXTENSIONS.get(extension)
+
+
+def read_rows(file, file_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Read the rows of a file one at a time.
+
+    Yields a tuple: (RowNumber, Row | None, ErrorMessage | None)
+    """
+    if file_format == CSV_FORMAT:
+        # The header is row 1
+        for row_number, row in enumerate(csv.DictReader(file), 2):
+            yield (row_number, row, None)
+
+        return
+
+    for row_number, line in enumerate(file, 1):
+        # Skip blank lines, which are common at the end of files
+        if line.strip() == "":
+            continue
+
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield (row_number, None, f"Invalid JSON ({error.msg})")
+            continue
+
+        if not isinstance(row, dict):
+            yield (row_number, None, "Row isn't a JSON object")
+            continue
+
+        yield (row_number, row, None)
+
+
+@functools.cache
+def get_field(column: str) -> MovieField | None:
+    """Get the movie field for a column name, which is cached since every row repeats the same names."""
+    return MovieField.from_str(column)
+
+
+def parse_movie(row: dict) -> tuple[Movie | None, str | None]:
+    """Parse a row from a file into a movie, validating every field.
+
+    Returns a tuple: (Movie | None, ErrorMessage | None)
+    """
+    values = {}
+    for key, value in row.items():
+        field = get_field(str(key))
+        if field is None or field is MovieField.ID:
+            # Unknown columns and IDs are ignored, since the database assigns new IDs
+            continue
+
+        # JSON values can be lists and numbers, but fields are validated from the text the user would type
+        if value is None:
+            value = ""
+        elif isinstance(value, list):
+            value = ", ".join(map(str, value))
+        else:
+            value = str(value)
+
+        values[field] = value
+
+    parsed_values = []
+    for field in MOVIE_FIELDS:
+        (is_valid, parsed_value, error_message) = field.validate_field(values.get(field, ""), True)
+
+        # Instead of not is_valid, do this because is_valid could be None
+        if is_valid == False:  # noqa: E712
+            return (None, error_message)
+
+        parsed_values.append(parsed_value)
+
+    return (Movie(0, *parsed_values), None)
+
+
+def read_movies(path: str, on_reject: Callable[[int, str], None]) -> Iterator[Movie]:
+    """Stream the valid movies from a file.
+
+    Rows that aren't valid are skipped and passed to on_reject with their row number and the reason.
+    """
+    file_format = get_format(path)
+
+    with open(path, newline="", encoding="utf-8") as file:
+        for row_number, row, error_message in read_rows(file, file_format):
+            if row is not None:
+                (movie, error_message) = parse_movie(row)
+                if movie is not None:
+                    yield movie
+                    continue
+
+            on_reject(row_number, error_message)
+
+
+def import_file(path: str, batch_size: int = db.BULK_INSERT_BATCH_SIZE) -> ImportResult:
+    """Import all of the movies from a file into the database."""
+    result = ImportResult(path)
+    start_time = time.perf_counter()
+
+    movies = read_movies(path, result.reject)
+    result.imported = db.bulk_insert(
+        movies, batch_size, lambda movie, message: result.reject(None, f"'{movie.name}' - {message}")
+    )
+
+    result.seconds = time.perf_counter() - start_time
+    return result
+
+
+def get_column_name(field: MovieField) -> str:
+    """Get the name of the column that a movie field is exported to, which can be imported again."""
+    return field.name.lower()
+
+
+def movie_to_row(movie: Movie) -> dict:
+    """Convert a movie into a row that can be written to a file."""
+    audience_rating = None if movie.audience_rating is None else str(movie.audience_rating)
+    genres = None if movie.genre is None else [str(genre) for genre in movie.genre]
+
+    return {
+        get_column_name(MovieField.ID): movie.id,
+        get_column_name(MovieField.NAME): movie.name,
+        get_column_name(MovieField.RELEASE_YEAR): movie.release_year,
+        get_column_name(MovieField.AUDIENCE_RATING): audience_rating,
+        get_column_name(MovieField.RUNTIME): movie.runtime,
+        get_column_name(MovieField.GENRE): genres,
+        get_column_name(MovieField.STAR_RATING): movie.star_rating,
+        get_column_name(MovieField.WHERE_TO_WATCH): movie.where_to_watch,
+    }
+
+
+def write_rows(file, file_format: str, movies: Iterator[Movie]) -> int:
+    """Write the movies to a file one at a time and return how many were written."""
+    exported = 0
+
+    if file_format == CSV_FORMAT:
+        columns = [get_column_name(field) for field in [MovieField.ID, *MOVIE_FIELDS]]
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+
+        for movie in movies:
+            row = movie_to_row(movie)
+
+            # The genres are written the same way the user would type them
+            genre_column = get_column_name(MovieField.GENRE)
+            if row[genre_column] is not None:
+                row[genre_column] = ", ".join(row[genre_column])
+
+            writer.writerow(row)
+            exported += 1
+
+        return exported
+
+    for movie in movies:
+        file.write(json.dumps(movie_to_row(movie), ensure_ascii=False))
+        file.write("\n")
+        exported += 1
+
+    return exported
+
+
+def export_file(path: str, file_format: str, batch_size: int = db.ITER_BATCH_SIZE) -> ExportResult:
+    """Export all of the movies in the database to a file."""
+    result = ExportResult(path, file_format)
+    start_time = time.perf_counter()
+
+    # Write to a temporary file first, so an existing export is never left half written
+    temporary_path = f"{path}.tmp"
+    try:
+        with open(temporary_path, "w", newline="", encoding="utf-8") as file:
+            result.exported = write_rows(file, file_format, db.iter_all(batch_size))
+
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    result.seconds = time.perf_counter() - start_time
+    return result
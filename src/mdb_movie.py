@@ -131,6 +131,11 @@ class Genre(enum.Enum):
         return name[0].upper() + name[1:]
 
 
+# Lookup tables for decoding values from the database without parsing them
+AUDIENCE_RATINGS_BY_VALUE = {rating.value: rating for rating in AudienceRating}
+GENRES_BY_DB_STRING = {str(genre.value): genre for genre in Genre}
+
+
 class MovieField(enum.Enum):
     """An enum representing an ID for a field from a movie."""
 
@@ -406,7 +411,12 @@ class MovieField(enum.Enum):
 
 
 class Movie:
-    """An object that encapsulates a movie."""
+    """An object that encapsulates a movie.
+
+    Slots are used instead of a dictionary of attributes, since a lot of movies can be loaded at once.
+    """
+
+    __slots__ = ("id", "name", "release_year", "audience_rating", "runtime", "_genre", "star_rating", "where_to_watch")
 
     def __init__(
         self,
@@ -415,7 +425,7 @@ class Movie:
         release_year: int | None = None,
         audience_rating: AudienceRating | None = None,
         runtime: int | None = None,
-        genre: list[Genre] | None = None,
+        genre: tuple[Genre, ...] | list[Genre] | None = None,
         star_rating: int | None = None,
         where_to_watch: str | None = None,
     ):
@@ -429,6 +439,19 @@ class Movie:
         self.star_rating = star_rating
         self.where_to_watch = where_to_watch
 
+    @property
+    def genre(self) -> tuple[Genre, ...] | None:
+        """The genres of this movie."""
+        return self._genre
+
+    @genre.setter
+    def genre(self, genre: tuple[Genre, ...] | list[Genre] | None):
+        """Set the genres of this movie.
+
+        They are stored as a tuple, so movies with the same genres can share them.
+        """
+        self._genre = None if genre is None else tuple(genre)
+
     @property
     def star_rating_string(self) -> str:
         """Get a string of 5 stars representing the star rating of this movie."""
@@ -442,14 +465,6 @@ class Movie:
 
         return self.audience_rating.value
 
-    @property
-    def genre_db(self) -> str | None:
-        """Get the genres of this movie that can be stored in a database."""
-        if self.genre is None:
-            return None
-
-        return ":".join(map(lambda g: str(g.value), self.genre))
-
     def __str__(self):
         """Convert this movie into a string."""
         output = f"[{self.id}] {self.name}"
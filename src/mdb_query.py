@@ -0,0 +1,308 @@
+"""The code related to the query language, which searches several fields at once.
+
+A query is made of comparisons such as genre=action, year>=2014 or runtime between 90 and 120,
+which can be combined with AND, OR, NOT and brackets. Comparisons next to each other are combined with AND.
+Values with spaces have to be in quotes, such as name="star trek".
+
+Queries are parsed into a tree, which is compiled into the condition of a single SQL statement.
+"""
+
+import re
+
+import mdb_database as db
+from mdb_movie import MovieField
+
+# The fields that can be searched, keyed by their names and some shorter names
+FIELDS = {field.name.lower(): field for field in MovieField if field != MovieField.ID}
+FIELDS.update(
+    {
+        "year": MovieField.RELEASE_YEAR,
+        "rating": MovieField.AUDIENCE_RATING,
+        "genres": MovieField.GENRE,
+        "stars": MovieField.STAR_RATING,
+    }
+)
+
+# The operators that compare a field to a value
+OPERATORS = ["=", "!=", "<", "<=", ">", ">="]
+
+# Splits a query into quoted strings, operators, brackets and words
+TOKEN_PATTERN = re.compile(r"""\s*(?:("[^"]*"|'[^']*')|(<=|>=|!=|[()=<>])|([^\s()<>=!"']+))""")
+
+# How expensive each kind of comparison is to check, so the cheapest are checked first
+# Equality on an indexed column is the cheapest, then ranges of an indexed column, then subqueries
+COST_EQUALS = 0
+COST_RANGE = 1
+COST_GENRE = 2
+COST_TEXT = 3
+COST_COMPOUND = 4
+
+
+class QueryError(Exception):
+    """An error in the text of a query."""
+
+
+class Comparison:
+    """A comparison between a field and one or more values, such as year>=2014."""
+
+    def __init__(self, field: MovieField, operator: str, values: list):
+        """Create a comparison."""
+        self.field = field
+        self.operator = operator
+        self.values = values
+
+    @property
+    def cost(self) -> int:
+        """How expensive the comparison is to check."""
+        if self.field == MovieField.GENRE:
+            return COST_GENRE
+
+        if self.field in db.SEARCH_FIELDS:
+            return COST_TEXT
+
+        return COST_EQUALS if self.operator == "=" else COST_RANGE
+
+    def compile(self) -> tuple[str, list]:
+        """Compile the comparison into SQL.
+
+        Returns a tuple: (Condition, Parameters)
+        """
+        sql_filter = db.get_comparison_sql(self.field, self.operator, self.values)
+        return (sql_filter.condition, sql_filter.parameters)
+
+
+class And:
+    """A group of parts of a query that all have to match."""
+
+    def __init__(self, children: list):
+        """Create a group."""
+        # Cheaper comparisons go first, so SQLite checks them (and uses their indexes) before the slower ones
+        # Sorting is stable, so comparisons that cost the same stay in the order they were written
+        self.children = sorted(children, key=lambda child: child.cost)
+
+    @property
+    def cost(self) -> int:
+        """How expensive the group is to check."""
+        return COST_COMPOUND
+
+    def compile(self) -> tuple[str, list]:
+        """Compile the group into SQL.
+
+        Returns a tuple: (Condition, Parameters)
+        """
+        return compile_children(self.children, " AND ")
+
+
+class Or:
+    """A group of parts of a query where any of them has to match."""
+
+    def __init__(self, children: list):
+        """Create a group."""
+        self.children = children
+
+    @property
+    def cost(self) -> int:
+        """How expensive the group is to check."""
+        return COST_COMPOUND
+
+    def compile(self) -> tuple[str, list]:
+        """Compile the group into SQL.
+
+        Returns a tuple: (Condition, Parameters)
+        """
+        return compile_children(self.children, " OR ")
+
+
+class Not:
+    """A part of a query that mustn't match."""
+
+    def __init__(self, child):
+        """Create a negation."""
+        self.child = child
+
+    @property
+    def cost(self) -> int:
+        """How expensive the negation is to check."""
+        return COST_COMPOUND
+
+    def compile(self) -> tuple[str, list]:
+        """Compile the negation into SQL.
+
+        Returns a tuple: (Condition, Parameters)
+        """
+        (condition, parameters) = self.child.compile()
+        return (f"NOT ({condition})", parameters)
+
+
+def compile_children(children: list, separator: str) -> tuple[str, list]:
+    """Compile the parts of a group and join them with the separator.
+
+    Returns a tuple: (Condition, Parameters)
+    """
+    conditions = []
+    parameters = []
+    for child in children:
+        (condition, child_parameters) = child.compile()
+        conditions.append(f"({condition})")
+        parameters += child_parameters
+
+    return (separator.join(conditions), parameters)
+
+
+class Parser:
+    """Turns the text of a query into a tree of comparisons, which are grouped by And, Or and Not."""
+
+    def __init__(self, text: str):
+        """Split the text into tokens, ready to be parsed."""
+        self.tokens = []
+        self.index = 0
+
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if match is None:
+                raise QueryError(f"Unexpected '{text[position:].strip()[0]}'")
+
+            (string, symbol, word) = match.groups()
+            if string is not None:
+                # Strings are always values, so they are marked so they aren't mistaken for keywords
+                self.tokens.append(("string", string[1:-1]))
+            elif symbol is not None:
+                self.tokens.append(("symbol", symbol))
+            else:
+                self.tokens.append(("word", word))
+
+            position = match.end()
+
+    def peek(self) -> str | None:
+        """Get the next token without using it, or None if there are no more tokens."""
+        if self.index >= len(self.tokens):
+            return None
+
+        return self.tokens[self.index][1]
+
+    def peek_keyword(self) -> str | None:
+        """Get the next token in lower case if it isn't a string, since only those can be keywords."""
+        if self.index >= len(self.tokens) or self.tokens[self.index][0] == "string":
+            return None
+
+        return self.tokens[self.index][1].lower()
+
+    def next(self, expected: str) -> str:
+        """Use the next token, or raise an error saying what was expected if there are no more tokens."""
+        token = self.peek()
+        if token is None:
+            raise QueryError(f"Expected {expected} at the end of the query")
+
+        self.index += 1
+        return token
+
+    def parse(self):
+        """Parse the whole query."""
+        if len(self.tokens) <= 0:
+            raise QueryError("No query was given")
+
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError(f"Unexpected '{self.peek()}'")
+
+        return node
+
+    def parse_or(self):
+        """Parse parts of a query separated by OR."""
+        children = [self.parse_and()]
+        while self.peek_keyword() == "or":
+            self.index += 1
+            children.append(self.parse_and())
+
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self):
+        """Parse parts of a query separated by AND, or next to each other."""
+        children = [self.parse_not()]
+        while self.peek() is not None and self.peek_keyword() not in ["or", ")"]:
+            if self.peek_keyword() == "and":
+                self.index += 1
+
+            children.append(self.parse_not())
+
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self):
+        """Parse a part of a query that might be negated by NOT."""
+        if self.peek_keyword() == "not":
+            self.index += 1
+            return Not(self.parse_not())
+
+        return self.parse_term()
+
+    def parse_term(self):
+        """Parse a comparison or a query in brackets."""
+        if self.peek_keyword() == "(":
+            self.index += 1
+            node = self.parse_or()
+            if self.next("')'") != ")":
+                raise QueryError(f"Expected ')' instead of '{self.tokens[self.index - 1][1]}'")
+
+            return node
+
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        """Parse a comparison, such as year>=2014 or runtime between 90 and 120."""
+        name = self.next("a field")
+        field = FIELDS.get(name.lower())
+        if field is None:
+            raise QueryError(f"Unknown field '{name}' - Values with spaces need to be in quotes")
+
+        operator = self.next(f"a comparison after '{name}'").lower()
+        if operator not in OPERATORS and operator != "between":
+            raise QueryError(f"Expected a comparison after '{name}' instead of '{operator}'")
+
+        if operator not in ["=", "!="] and field not in db.RANGE_FIELDS:
+            range_fields = ", ".join(field.name.lower() for field in db.RANGE_FIELDS)
+            raise QueryError(f"'{operator}' can only be used with {range_fields}")
+
+        values = [self.parse_value(field)]
+        if operator == "between":
+            if self.peek_keyword() != "and":
+                raise QueryError(f"Expected 'and' after 'between {values[0]}'")
+
+            self.index += 1
+            values.append(self.parse_value(field))
+
+        # Not equal is the opposite of equal, which works for every field
+        if operator == "!=":
+            return Not(Comparison(field, "=", values))
+
+        return Comparison(field, operator, values)
+
+    def parse_value(self, field: MovieField) -> any:
+        """Parse a value, which has to be valid for the field."""
+        text = self.next(f"a value for {field.name.lower()}")
+        (is_valid, value, error_message) = field.validate_field(text)
+        if is_valid is None:
+            raise QueryError(f"No value was given for {field.name.lower()}")
+
+        if not is_valid:
+            raise QueryError(f"Invalid value '{text}' - {error_message}")
+
+        return value
+
+
+def parse(text: str) -> tuple[any, str | None]:
+    """Parse the text of a query into a tree that can be compiled.
+
+    Returns a tuple: (Query | None, ErrorMessage | None)
+    """
+    try:
+        return (Parser(text).parse(), None)
+    except QueryError as error:
+        return (None, str(error))
+
+
+def compile_query(query) -> db.Filter:
+    """Compile a parsed query into a filter for the database."""
+    (condition, parameters) = query.compile()
+    return db.Filter(condition, parameters)
@@ -0,0 +1,73 @@
+"""The code related to running commands from a script instead of the console UI.
+
+Each line of the script is given to the same commands and pages as the console UI, but nothing is rendered.
+Instead, a line of JSON is printed for each one, with what the page shows and any error.
+"""
+
+import json
+import sys
+from typing import TextIO
+
+import mdb_console as console
+import mdb_ui as ui
+
+# Lines starting with this are ignored, unless a page is asking for a value
+COMMENT_PREFIX = "#"
+
+
+def run(path: str) -> int:
+    """Run the commands in a file, or in stdin if the path is "-".
+
+    Returns the exit code, which is 1 if any of the commands failed.
+    """
+    if path == "-":
+        return run_lines(sys.stdin, sys.stdout)
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            return run_lines(file, sys.stdout)
+    except OSError as error:
+        print(f"Error: The script '{path}' couldn't be read ({error})", file=sys.stderr)
+        return 1
+
+
+def run_lines(lines: TextIO, output: TextIO) -> int:
+    """Run each line as if the user typed it, writing the outcome of each one to the output.
+
+    Returns the exit code, which is 1 if any of the lines failed.
+    """
+    exit_code = 0
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        # While a page is asking for a value, an empty line skips it and # can start it, like in the UI
+        if not ui.current_page.getting_input and (line == "" or line.startswith(COMMENT_PREFIX)):
+            continue
+
+        outcome = {"line": line_number, **run_line(line)}
+        output.write(json.dumps(outcome, ensure_ascii=False) + "\n")
+
+        if outcome["error"] is not None:
+            exit_code = 1
+
+        # Stop if the script used the exit command
+        if not console.is_running:
+            break
+
+    output.flush()
+    return exit_code
+
+
+def run_line(line: str) -> dict:
+    """Give a line to the current page as if the user typed it, and get the outcome."""
+    console.user_input = line
+    ui.update_current_page()
+
+    page = ui.current_page
+    result = page.get_result()
+    outcome = {"input": line, "page": page.name, "error": page.error_message, "result": result}
+
+    # Errors only last for the input that caused them, like they do in the UI
+    page.error_message = None
+    console.user_input = None
+    return outcome
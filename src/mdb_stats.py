@@ -0,0 +1,198 @@
+"""The code related to measuring how long things take.
+
+Nothing is recorded unless the MDB_STATS environment variable is set to 1.
+The timings are shown by the stats command, and written to MDB_STATS_FILE (mdb_stats.json by default) on exit.
+"""
+
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+# Whether timings are recorded
+enabled = os.environ.get("MDB_STATS", "0").strip().lower() in ["1", "true", "yes", "on"]
+
+# The file the stats are written to on exit
+output_path = os.environ.get("MDB_STATS_FILE", "mdb_stats.json")
+
+# The percentiles shown for each timing
+PERCENTILES = [50, 95, 99]
+
+
+class Histogram:
+    """A count of how long something took, grouped into buckets that each double in size."""
+
+    def __init__(self):
+        """Create an empty histogram."""
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        # The number of times in each bucket, keyed by the bucket's upper bound in microseconds (a power of 2)
+        self.buckets = {}
+
+    def add(self, seconds: float):
+        """Add a time to the histogram."""
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+        bucket = 1 << int(seconds * 1_000_000).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        """The average time."""
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Get the upper bound in seconds of the bucket that the given percentile falls in.
+
+        It is never more than the slowest time, which is often less than the upper bound of its bucket.
+        """
+        target = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(bucket / 1_000_000, self.max)
+
+        return 0.0
+
+    def to_dict(self) -> dict:
+        """Convert the histogram into a dictionary that can be written as JSON."""
+        output = {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.mean,
+            "min_seconds": self.min,
+            "max_seconds": self.max,
+        }
+
+        for percent in PERCENTILES:
+            output[f"p{percent}_seconds"] = self.percentile(percent)
+
+        output["buckets_microseconds"] = {str(bucket): count for bucket, count in sorted(self.buckets.items())}
+        return output
+
+
+class QueryStats:
+    """What a database function did each time it was called."""
+
+    def __init__(self):
+        """Create empty stats."""
+        self.rows = 0
+        # The number of times each SQL statement was run, keyed by the statement
+        self.statements = {}
+
+    def to_dict(self) -> dict:
+        """Convert the stats into a dictionary that can be written as JSON."""
+        return {"rows": self.rows, "statements": self.statements}
+
+
+# The timings of each part of the app, keyed by name
+timings = {}
+
+# The SQL statements and rows of each database function, keyed by the name of the function
+queries = {}
+
+# The number of frames drawn, and the cells and characters of the last one and all of them together
+frames = 0
+last_cells_rendered = 0
+total_cells_rendered = 0
+last_frame_size = 0
+total_frame_size = 0
+
+# Timings are recorded by both the UI and the database thread
+lock = threading.Lock()
+
+
+def record(name: str, seconds: float):
+    """Record how long something took."""
+    with lock:
+        histogram = timings.get(name)
+        if histogram is None:
+            histogram = timings[name] = Histogram()
+
+        histogram.add(seconds)
+
+
+@contextlib.contextmanager
+def timer(name: str):
+    """Record how long the code inside the with block takes, if stats are enabled."""
+    if not enabled:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start_time)
+
+
+def record_frame(cells_rendered: int, frame_size: int):
+    """Record how many cells were rendered and how many characters were written for a frame."""
+    global frames
+    global last_cells_rendered
+    global total_cells_rendered
+    global last_frame_size
+    global total_frame_size
+
+    frames += 1
+    last_cells_rendered = cells_rendered
+    total_cells_rendered += cells_rendered
+    last_frame_size = frame_size
+    total_frame_size += frame_size
+
+
+def get_frame_counters() -> dict:
+    """Get the counts of the frames that have been drawn."""
+    return {
+        "frames": frames,
+        "last_cells_rendered": last_cells_rendered,
+        "total_cells_rendered": total_cells_rendered,
+        "last_frame_size": last_frame_size,
+        "total_frame_size": total_frame_size,
+    }
+
+
+def record_query(name: str, seconds: float, statements: list[str], rows: int | None):
+    """Record a call to a database function, with the SQL statements it ran and the number of rows it returned."""
+    record(f"database.{name}", seconds)
+
+    with lock:
+        query_stats = queries.get(name)
+        if query_stats is None:
+            query_stats = queries[name] = QueryStats()
+
+        if rows is not None:
+            query_stats.rows += rows
+
+        for statement in statements:
+            # Queries are spread over lines with indents, which only makes them harder to compare
+            statement = re.sub(r"\s+", " ", statement).strip()
+            query_stats.statements[statement] = query_stats.statements.get(statement, 0) + 1
+
+
+def to_dict(counters: dict) -> dict:
+    """Convert all of the stats into a dictionary that can be written as JSON."""
+    with lock:
+        return {
+            "timings": {name: histogram.to_dict() for name, histogram in sorted(timings.items())},
+            "queries": {name: query_stats.to_dict() for name, query_stats in sorted(queries.items())},
+            "frames": get_frame_counters(),
+            "counters": counters,
+        }
+
+
+def dump(counters: dict):
+    """Write the stats to the output file, if stats are enabled."""
+    if not enabled:
+        return
+
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(to_dict(counters), file, indent=2)
@@ -1,7 +1,13 @@
 """The code related to managing the individual pages of the UI."""
 
+import asyncio
+import sqlite3
+from collections.abc import Callable
+
 import mdb_commands as commands
 import mdb_console as console
+import mdb_database as db
+import mdb_stats as stats
 
 # TODO: go through error messages
 
@@ -23,10 +29,10 @@ LOGO_WIDTH = len(LOGO[0])
 LOGO_HEIGHT = len(LOGO)
 
 # https://en.wikipedia.org/wiki/Box-drawing_characters
-HORIZONTAL_BAR_CHAR = "─"
-VERTICAL_BAR_CHAR = "│"
+HORIZONTAL_BAR_CHAR = console.HORIZONTAL_BAR_CHAR
+VERTICAL_BAR_CHAR = console.VERTICAL_BAR_CHAR
 PLUS_BAR_CHAR = "┼"
-CORNER_BAR_CHARS = "┌┐└┘"
+CORNER_BAR_CHARS = console.CORNER_BAR_CHARS
 T_BAR_CHARS = "├┤┬┴"
 
 FULL_STAR_CHAR = "★"
@@ -55,13 +61,82 @@ class Page:
         self.getting_input = False
         self.commands = []
 
+        # Increased whenever the page changes, so the last time it was drawn can be reused until then
+        # Pages that don't keep track of their changes leave it as None, and are drawn every frame
+        self.version = None
+
+        # The background work the page is waiting on and the message shown while it runs
+        self.task: asyncio.Task = None
+        self.loading_message = None
+
     def render(self):
         """Render the page."""
         self.error_message = "Page has no render code"
 
+    def handle_input(self):
+        """Handle the user's input to the page, after it has been checked for commands."""
+        pass
+
+    def get_result(self) -> any:
+        """Get what the page shows as a value that can be written as JSON, so scripts can use it."""
+        return None
+
+    def mark_changed(self):
+        """Make the page be drawn again on the next frame, if it keeps track of its changes."""
+        if self.version is not None:
+            self.version += 1
+
+    def run_task(self, loading_message: str, function: Callable, *args, on_done: Callable[[any], None]):
+        """Run a slow function on the database thread, then give its result to on_done and rerender the page.
+
+        The loading message is shown until it finishes. Without an event loop, it runs straight away instead.
+        If the database fails, the error is shown on the page instead of on_done being called.
+        """
+        if console.loop is None:
+            try:
+                result = function(*args)
+            except sqlite3.Error as error:
+                self.on_database_error(error)
+                return
+
+            on_done(result)
+            return
+
+        self.loading_message = loading_message
+        self.task = console.loop.create_task(db.run_async(function, *args))
+        self.task.add_done_callback(lambda task: self.finish_task(task, on_done))
+
+    def finish_task(self, task: asyncio.Task, on_done: Callable[[any], None]):
+        """Give the result of the background work to on_done once it finishes."""
+        # Tasks are only cancelled when the app is closing
+        if task.cancelled():
+            return
+
+        self.task = None
+        self.loading_message = None
+
+        # Errors from the database (such as it being locked by another program) shouldn't close the app
+        error = task.exception()
+        if isinstance(error, sqlite3.Error):
+            self.on_database_error(error)
+        else:
+            on_done(task.result())
+
+        console.request_redraw()
+
+    def on_database_error(self, error: sqlite3.Error):
+        """Show an error from the database, and let the user leave the page in case it was waiting for an answer."""
+        self.error_message = f"The database couldn't be used ({error})"
+        self.global_commands_available = True
+
 
 current_page: Page = None
 
+# The parts of the screen that are reused between frames until they change
+page_layer = console.Layer()
+border_layer = console.Layer()
+commands_layer = console.Layer()
+
 
 def init_pages():
     """Initialize the pages."""
@@ -72,9 +147,13 @@ def init_pages():
     import pages.movies
     import pages.insert
     import pages.search
+    import pages.query
     import pages.edit
     import pages.delete
     import pages.reset
+    import pages.importer
+    import pages.exporter
+    import pages.stats
 
     # Static page init
     pages.home.HomePage.setup()
@@ -82,9 +161,13 @@ def init_pages():
     pages.movies.AllMoviesPage.setup()
     pages.insert.InsertPage.setup()
     pages.search.SearchPage.setup()
+    pages.query.QueryPage.setup()
     pages.edit.EditPage.setup()
     pages.delete.DeletePage.setup()
     pages.reset.ResetPage.setup()
+    pages.importer.ImportPage.setup()
+    pages.exporter.ExportPage.setup()
+    pages.stats.StatsPage.setup()
 
     # Set the default page
     global current_page
@@ -93,7 +176,8 @@ def init_pages():
 
 def render_current_page():
     """Render the current page of the UI."""
-    handle_commands()
+    with stats.timer("ui.handle_commands"):
+        update_current_page()
 
     # Stop rendering if we exited
     if not console.is_running:
@@ -107,12 +191,27 @@ def render_current_page():
         console.write(0, 0, f"Error: Console too small to render page {size_hint}", COLOUR_RED)
         return
 
-    # Render the UI
-    current_page.render()
-    render_common_ui()
+    # Render the UI, reusing the last drawing of the page if it hasn't changed
+    # Some pages have less room when there is an error message, so that is part of the key too
+    with stats.timer("ui.render_page"):
+        if current_page.version is None:
+            current_page.render()
+        else:
+            page_key = (current_page, current_page.version, current_page.error_message is None)
+            page_layer.draw(page_key, current_page.render)
+
+    with stats.timer("ui.render_common_ui"):
+        render_common_ui()
+
+    # Reset stuff, unless the page is only being redrawn (such as when the console is resized)
+    if console.user_input is not None:
+        current_page.error_message = None
 
-    # Reset stuff
-    current_page.error_message = None
+
+def update_current_page():
+    """Use the user's input as a command, or give it to the current page if it is getting input."""
+    handle_commands()
+    current_page.handle_input()
 
 
 def handle_commands():
@@ -137,10 +236,13 @@ def handle_commands():
     command_name = command[0].lower()
     command_args = command[1:]
 
-    # Invoke the command
-    command = commands.find(command_name)
-    if command is not None:
-        command.invoke(command_args)
+    # Invoke the command, which can be shortened to the start of its name if no other command starts with it
+    matches = commands.find_matches(command_name)
+    if len(matches) == 1:
+        matches[0].invoke(command_args)
+    elif len(matches) > 1:
+        names = ", ".join(command.name for command in matches)
+        current_page.error_message = f"'{command_name}' could be any of these commands: {names}"
     else:
         current_page.error_message = f"'{console.user_input}' is not a valid command"
 
@@ -148,28 +250,26 @@ def handle_commands():
 def render_common_ui():
     """Render the UI common to all pages."""
     # Draw a border around the window
-    for x in range(console.width):
-        console.set(x, 0, HORIZONTAL_BAR_CHAR)
-        console.set(x, -1, HORIZONTAL_BAR_CHAR)
-
-    for y in range(console.height):
-        console.set(0, y, VERTICAL_BAR_CHAR)
-        console.set(-1, y, VERTICAL_BAR_CHAR)
-
-    console.set(0, 0, CORNER_BAR_CHARS[0])
-    console.set(-1, 0, CORNER_BAR_CHARS[1])
-    console.set(0, -1, CORNER_BAR_CHARS[2])
-    console.set(-1, -1, CORNER_BAR_CHARS[3])
+    border_layer.draw(None, lambda: console.box(0, 0, console.width, console.height))
 
     # Draw the page name
     console.write(2, 1, current_page.name, COLOUR_YELLOW)
 
+    # Draw what the page is waiting on
+    if current_page.loading_message is not None:
+        console.write(3 + len(current_page.name), 1, f"- {current_page.loading_message}...", COLOUR_LIGHT_BLUE)
+
     # Draw the error message
     if current_page.error_message is not None:
         console.write(2, -2, f"Error: {current_page.error_message}", COLOUR_RED)
 
-    # Draw the list of commands
+    # Draw the list of commands, which only changes when the page or its commands change
     commands_list = commands.get_available_commands()
+    commands_layer.draw(tuple(commands_list), lambda: render_commands(commands_list))
+
+
+def render_commands(commands_list: list[commands.Command]):
+    """Render the panel that lists the available commands."""
     if len(commands_list) <= 0:
         return
 
@@ -181,9 +281,7 @@ def render_common_ui():
     command_y = 1
 
     # Draw the left barrier
-    for y in range(console.height):
-        console.set(command_x - 2, y, VERTICAL_BAR_CHAR)
-
+    console.vline(command_x - 2, 0, console.height)
     console.set(command_x - 2, 0, T_BAR_CHARS[2])
     console.set(command_x - 2, -1, T_BAR_CHARS[3])
 
@@ -191,7 +289,12 @@ def render_common_ui():
     console.write(command_x, command_y, "Commands", COLOUR_YELLOW)
     command_y += 2
 
-    # List of commands
-    for command in commands_list:
+    # List of commands, which ends with "..." if they don't all fit above the bottom of the border
+    max_y = console.height - 2
+    for index, command in enumerate(commands_list):
+        if command_y >= max_y and index < len(commands_list) - 1:
+            console.write(command_x, command_y, "...", COLOUR_LIGHT_BLUE)
+            break
+
         console.write(command_x, command_y, command, COLOUR_LIGHT_BLUE)
         command_y += 1
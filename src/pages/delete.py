@@ -18,30 +18,42 @@ class DeletePage(ui.Page):
         """Create a page."""
         super().__init__("Delete")
         self.movie_id = movie_id
-
-        self.global_commands_available = False
-        self.commands.append(Command("yes", DeletePage.command_yes))
-        self.commands.append(Command("no", DeletePage.command_no))
+        self.movie = None
         self.movie_deleted = None
 
+        # The user can only answer once the movie has been found
+        self.run_task("Loading movie", db.get, movie_id, on_done=self.on_loaded)
+
     @staticmethod
     def command_delete(movie_id):
         """Go to the delete page."""
-        if db.get(movie_id) is None:
-            ui.current_page.error_message = f"Invalid movie id ({movie_id})"
+        ui.current_page = DeletePage(movie_id)
+
+    def on_loaded(self, movie):
+        """Ask the user to confirm once the movie has been loaded."""
+        self.movie = movie
+        if movie is None:
+            self.error_message = f"Invalid movie id ({self.movie_id})"
             return
 
-        ui.current_page = DeletePage(movie_id)
+        self.global_commands_available = False
+        self.commands.append(Command("yes", DeletePage.command_yes))
+        self.commands.append(Command("no", DeletePage.command_no))
 
     @staticmethod
     def command_yes():
         """Call when the user enters "no"."""
-        db.delete(ui.current_page.movie_id)
-        ui.current_page.movie_deleted = True
+        # Don't let the user leave until the movie is deleted
+        page = ui.current_page
+        page.commands.clear()
+        page.run_task("Deleting movie", db.delete, page.movie_id, on_done=page.on_deleted)
+
+    def on_deleted(self, _):
+        """Call once the movie has been deleted."""
+        self.movie_deleted = True
 
         # Allow the user to leave
-        ui.current_page.global_commands_available = True
-        ui.current_page.commands.clear()
+        self.global_commands_available = True
 
     @staticmethod
     def command_no():
@@ -52,17 +64,26 @@ class DeletePage(ui.Page):
         ui.current_page.global_commands_available = True
         ui.current_page.commands.clear()
 
+    def get_result(self) -> dict:
+        """Get whether the movie was deleted, which is None until the user answers."""
+        return {"movie_id": self.movie_id, "deleted": self.movie_deleted}
+
     def render(self):
         """Render the page."""
         message_x = 2
         message_y = 2
 
+        # Wait for the movie to be loaded, or leave it to the error message if it doesn't exist
+        if self.movie is None:
+            return
+
         # Write a message so the user knows whats happening
-        movie = db.get(self.movie_id)
-        if self.movie_deleted is None:
+        if self.task is not None:
+            console.write(message_x, message_y, "Please wait while the movie is deleted", ui.COLOUR_BLUE)
+        elif self.movie_deleted is None:
             console.write(message_x, message_y, "Are you sure you want to delete the movie?", ui.COLOUR_RED)
             message_y += 1
-            console.write(message_x, message_y, movie, ui.COLOUR_BLUE)
+            console.write(message_x, message_y, self.movie, ui.COLOUR_BLUE)
         elif self.movie_deleted:
             console.write(message_x, message_y, "The movie was deleted", ui.COLOUR_RED)
         else:
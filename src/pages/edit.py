@@ -3,7 +3,7 @@
 import mdb_database as db
 import mdb_ui as ui
 from mdb_commands import Command, commands
-from mdb_movie import MovieField
+from mdb_movie import Movie, MovieField
 from pages.insert import InsertPage
 
 
@@ -16,16 +16,29 @@ class EditPage(InsertPage):
         """Initialize the page."""
         commands.append(Command("edit", EditPage.command_edit))
 
-    def __init__(self, movie):
+    def __init__(self, movie_id):
         """Create a page."""
         super().__init__()
         self.name = "Edit"
-        self.movie = movie
+        self.movie_id = movie_id
         # Don't force the user to edit the name
         self.enforce_name = False
 
+        # The user is only asked for the new fields once the movie has been found
+        self.getting_input = False
+        self.run_task("Loading movie", db.get, movie_id, on_done=self.on_loaded)
+
+    def on_loaded(self, movie):
+        """Start asking for the new fields once the movie has been loaded."""
+        self.movie = movie
+        if movie is None:
+            self.error_message = f"Invalid movie id '{self.movie_id}'"
+            return
+
+        self.getting_input = True
+
     def on_finish_input(self):
-        """Add the movie to the database once the user is done giving input."""
+        """Update the movie in the database in the background once the user is done giving input."""
         # Edit the movie
         movie = self.movie
 
@@ -57,13 +70,16 @@ class EditPage(InsertPage):
         if where_to_watch is not None:
             movie.where_to_watch = where_to_watch
 
+        self.getting_input = False
+        self.run_task("Saving movie", self.save_movie, movie, on_done=self.on_saved)
+
+    @staticmethod
+    def save_movie(movie: Movie) -> Movie:
+        """Update the movie in the database, which runs on the database thread."""
         db.edit(movie)
-        movie_id = movie.id
 
         # Get the movie (to ensure it is properly updated)
-        self.getting_input = False
-        self.movie_added = True
-        self.movie = db.get(movie_id)
+        return db.get(movie.id)
 
     def get_prompt(self):
         """Get the prompt for the user for the given movie field."""
@@ -73,12 +89,14 @@ class EditPage(InsertPage):
         """Get the message to be displayed when the movie is added."""
         return "Movie successfully edited:"
 
+    def get_result(self) -> dict | None:
+        """Get the movie once it has been edited, or the prompt for the current field until then."""
+        if self.movie is None:
+            return None
+
+        return super().get_result()
+
     @staticmethod
     def command_edit(movie_id):
         """Go to the edit page."""
-        movie = db.get(movie_id)
-        if movie is None:
-            ui.current_page.error_message = f"Invalid movie id '{movie_id}'"
-            return
-
-        ui.current_page = EditPage(movie)
+        ui.current_page = EditPage(movie_id)
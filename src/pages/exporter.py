@@ -0,0 +1,69 @@
+"""The export page of the UI."""
+
+import sqlite3
+
+import mdb_console as console
+import mdb_io
+import mdb_ui as ui
+from mdb_commands import Command, commands
+
+
+class ExportPage(ui.Page):
+    """The export page of the UI."""
+
+    @staticmethod
+    def setup():
+        """Initialize the page."""
+        commands.append(Command("export", ExportPage.command_export))
+
+    def __init__(self, path: str, file_format: str):
+        """Create a page."""
+        super().__init__("Export")
+        self.result = None
+        self.run_task("Exporting", ExportPage.export_file, path, file_format, on_done=self.on_exported)
+
+    @staticmethod
+    def command_export(path, format):
+        """Export the movies to a CSV or JSON lines file."""
+        file_format = format.lower()
+        if file_format not in mdb_io.FORMATS:
+            ui.current_page.error_message = f"Invalid format '{format}' - Must be {' or '.join(mdb_io.FORMATS)}"
+            return
+
+        ui.current_page = ExportPage(path, file_format)
+
+    @staticmethod
+    def export_file(path: str, file_format: str) -> tuple[mdb_io.ExportResult | None, str | None]:
+        """Export the movies to a file.
+
+        Returns a tuple: (ExportResult | None, ErrorMessage | None)
+        """
+        try:
+            return (mdb_io.export_file(path, file_format), None)
+        except OSError as error:
+            return (None, f"The file '{path}' couldn't be written ({error.strerror})")
+        except sqlite3.Error as error:
+            return (None, f"The movies couldn't be read ({error})")
+
+    def on_exported(self, outcome: tuple[mdb_io.ExportResult | None, str | None]):
+        """Show the result once the movies have been exported."""
+        (self.result, self.error_message) = outcome
+
+    def get_result(self) -> dict | None:
+        """Get the outcome of the export."""
+        return None if self.result is None else self.result.to_dict()
+
+    def render(self):
+        """Render the page."""
+        message_x = 2
+        message_y = 2
+
+        # Wait for the movies to be exported
+        result = self.result
+        if result is None:
+            return
+
+        summary = f"Exported {result.exported} movies to '{result.path}' in {result.seconds:.2f}s"
+        console.write(message_x, message_y, summary, ui.COLOUR_BLUE)
+        message_y += 1
+        console.write(message_x, message_y, f"{result.rows_per_second:.0f} rows/sec")
@@ -16,6 +16,8 @@ class HomePage(ui.Page):
     def __init__(self):
         """Create a page."""
         super().__init__("Home")
+        # The home page never changes, so it is only drawn once
+        self.version = 0
 
     @staticmethod
     def command_home():
@@ -28,11 +30,9 @@ class HomePage(ui.Page):
         logo_x = 1
         logo_y = 3
 
-        # Draw the logo
-        for x in range(ui.LOGO_WIDTH):
-            for y in range(ui.LOGO_HEIGHT):
-                # Y before X in this because the rows are ordered first
-                console.set(logo_x + x, logo_y + y, ui.LOGO[y][x], ui.COLOUR_GREEN)
+        # Draw the logo a row at a time
+        for y in range(ui.LOGO_HEIGHT):
+            console.write_span(logo_x, logo_y + y, ui.LOGO[y], ui.COLOUR_GREEN)
 
         # Print name
         name_x = logo_x + 9
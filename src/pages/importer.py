@@ -0,0 +1,93 @@
+"""The import page of the UI."""
+
+import os
+import sqlite3
+
+import mdb_console as console
+import mdb_io
+import mdb_ui as ui
+from mdb_commands import Command, commands
+
+
+class ImportPage(ui.Page):
+    """The import page of the UI."""
+
+    @staticmethod
+    def setup():
+        """Initialize the page."""
+        commands.append(Command("import", ImportPage.command_import))
+
+    def __init__(self, path: str):
+        """Create a page."""
+        super().__init__("Import")
+        self.result = None
+        self.run_task("Importing", ImportPage.import_file, path, on_done=self.on_imported)
+
+    @staticmethod
+    def command_import(path):
+        """Import movies from a CSV or JSON lines file."""
+        if not os.path.isfile(path):
+            ui.current_page.error_message = f"The file '{path}' doesn't exist"
+            return
+
+        if mdb_io.get_format(path) is None:
+            ui.current_page.error_message = f"The file '{path}' isn't a CSV or JSON lines file"
+            return
+
+        ui.current_page = ImportPage(path)
+
+    @staticmethod
+    def import_file(path: str) -> tuple[mdb_io.ImportResult | None, str | None]:
+        """Import the movies from a file.
+
+        Returns a tuple: (ImportResult | None, ErrorMessage | None)
+        """
+        try:
+            return (mdb_io.import_file(path), None)
+        except (OSError, UnicodeDecodeError) as error:
+            return (None, f"The file '{path}' couldn't be read ({error})")
+        except sqlite3.Error as error:
+            return (None, f"The movies couldn't be imported ({error})")
+
+    def on_imported(self, outcome: tuple[mdb_io.ImportResult | None, str | None]):
+        """Show the result once the file has been imported."""
+        (self.result, self.error_message) = outcome
+
+    def get_result(self) -> dict | None:
+        """Get the outcome of the import."""
+        return None if self.result is None else self.result.to_dict()
+
+    def render(self):
+        """Render the page."""
+        message_x = 2
+        message_y = 2
+
+        # Wait for the file to be imported
+        result = self.result
+        if result is None:
+            return
+
+        # Summary
+        summary = f"Imported {result.imported} movies from '{result.path}' in {result.seconds:.2f}s"
+        console.write(message_x, message_y, summary, ui.COLOUR_BLUE)
+        message_y += 1
+        console.write(message_x, message_y, f"{result.rows_per_second:.0f} rows/sec")
+        message_y += 2
+
+        if result.rejected <= 0:
+            console.write(message_x, message_y, "No rows were rejected", ui.COLOUR_GREEN)
+            return
+
+        console.write(message_x, message_y, f"Rejected {result.rejected} rows:", ui.COLOUR_RED)
+        message_y += 1
+
+        # List as many of the rejections as can fit, leaving room for the error message
+        max_y = console.height - 3
+        for row_number, message in result.rejections:
+            if message_y >= max_y:
+                console.write(message_x, message_y, "...")
+                break
+
+            prefix = "" if row_number is None else f"Row {row_number}: "
+            console.write(message_x, message_y, f"{prefix}{message}")
+            message_y += 1
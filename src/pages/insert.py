@@ -2,6 +2,7 @@
 
 import mdb_console as console
 import mdb_database as db
+import mdb_io
 import mdb_ui as ui
 from mdb_commands import Command, commands
 from mdb_movie import Movie, MovieField
@@ -52,15 +53,23 @@ class InsertPage(ui.Page):
         return InsertPage.MOVIE_FIELDS[self.current_field_index]
 
     def on_finish_input(self):
-        """Add the movie to the database once the user is done giving input."""
-        # Add the movie
+        """Add the movie to the database in the background once the user is done giving input."""
         movie = Movie(0, *self.movie_fields.values())
+        self.getting_input = False
+        self.run_task("Saving movie", self.save_movie, movie, on_done=self.on_saved)
+
+    @staticmethod
+    def save_movie(movie: Movie) -> Movie:
+        """Add the movie to the database, which runs on the database thread."""
         movie_id = db.insert(movie)
 
         # Get the movie (with the updated ID from inserting it)
-        self.getting_input = False
+        return db.get(movie_id)
+
+    def on_saved(self, movie: Movie):
+        """Show the movie once it has been saved."""
         self.movie_added = True
-        self.movie = db.get(movie_id)
+        self.movie = movie
 
     def get_prompt(self):
         """Get the prompt for the user for the given movie field."""
@@ -72,9 +81,17 @@ class InsertPage(ui.Page):
 
     def handle_input(self):
         """Handle the page's input."""
-        # Don't use input if the user hasn't even been prompted yet
-        # Also don't handle input if the movie has been added already
-        if self.first_open or self.movie_added:
+        # Don't handle input if the movie has been added already, or if the page is only being redrawn
+        if self.movie_added or console.user_input is None:
+            return
+
+        # Don't use input if the user hasn't even been prompted yet, since it is the "insert" command
+        if self.first_open:
+            self.first_open = False
+            return
+
+        # Don't use input while the movie is being loaded or saved, since it is used as a command instead
+        if not self.getting_input:
             return
 
         # If we just asked the user for input, get it and validate it
@@ -99,23 +116,32 @@ class InsertPage(ui.Page):
         if self.current_field_index >= len(InsertPage.MOVIE_FIELDS):
             self.on_finish_input()
 
+    def get_result(self) -> dict:
+        """Get the movie once it has been added, or the prompt for the current field until then."""
+        if self.movie_added:
+            return mdb_io.movie_to_row(self.movie)
+
+        # There is nothing to show while the movie is being saved, or if it couldn't be
+        if not self.getting_input:
+            return None
+
+        return {"prompt": self.get_prompt()}
+
     def render(self):
         """Render the page."""
         message_x = 2
         message_y = 2
 
-        self.handle_input()
-
-        # This is used to stop the input from running on the "insert" command
-        if self.first_open:
-            self.first_open = False
-
         # Draw the info showing the after it is added
         if self.movie_added:
             console.write(message_x, message_y, self.get_complete_message(), ui.COLOUR_BLUE)
             console.write(message_x, message_y + 1, self.movie)
             return
 
+        # Wait for the movie to be saved
+        if not self.getting_input:
+            return
+
         # Draw the prompt for the user
         message = self.get_prompt()
         for line in message.split("\n"):
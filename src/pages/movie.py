@@ -2,6 +2,7 @@
 
 import mdb_console as console
 import mdb_database as db
+import mdb_io
 import mdb_ui as ui
 from mdb_commands import Command, commands, get_available_commands
 
@@ -18,15 +19,37 @@ class MoviePage(ui.Page):
         """Create a page."""
         super().__init__("Movie")
         self.movie_id = movie_id
-        self.movie = db.get(movie_id)
+        self.movie = None
+        self.movie_loaded = False
+        self.run_task("Loading movie", db.get, movie_id, on_done=self.on_loaded)
 
     @staticmethod
     def command_movie(movie_id):
         """Go to the movie page."""
         ui.current_page = MoviePage(movie_id)
 
+    def on_loaded(self, movie):
+        """Show the movie once it has been loaded."""
+        self.movie = movie
+        self.movie_loaded = True
+
+    def get_result(self) -> dict | None:
+        """Get the movie."""
+        if not self.movie_loaded:
+            return None
+
+        if self.movie is None:
+            self.error_message = f"A movie with an ID of '{self.movie_id}' doesn't exist"
+            return None
+
+        return mdb_io.movie_to_row(self.movie)
+
     def render(self):
         """Render the page."""
+        # Wait for the movie to be loaded, or leave it to the error message if it couldn't be
+        if not self.movie_loaded:
+            return
+
         # Check if the movie actually exists
         if self.movie is None:
             self.error_message = f"A movie with an ID of '{self.movie_id}' doesn't exist"
@@ -87,18 +110,7 @@ class MoviePage(ui.Page):
         y = round((console.height - height) / 2)
 
         # Draw a border
-        for border_x in range(width):
-            console.set(x + border_x, y, ui.HORIZONTAL_BAR_CHAR)
-            console.set(x + border_x, y + height - 1, ui.HORIZONTAL_BAR_CHAR)
-
-        for border_y in range(height):
-            console.set(x, y + border_y, ui.VERTICAL_BAR_CHAR)
-            console.set(x + width - 1, y + border_y, ui.VERTICAL_BAR_CHAR)
-
-        console.set(x, y, ui.CORNER_BAR_CHARS[0])
-        console.set(x + width - 1, y, ui.CORNER_BAR_CHARS[1])
-        console.set(x, y + height - 1, ui.CORNER_BAR_CHARS[2])
-        console.set(x + width - 1, y + height - 1, ui.CORNER_BAR_CHARS[3])
+        console.box(x, y, width, height)
 
         # Shift the fields down and right
         x += 2
@@ -2,8 +2,10 @@
 
 import mdb_console as console
 import mdb_database as db
+import mdb_io
 import mdb_ui as ui
 from mdb_commands import Command, commands
+from mdb_movie import Movie, MovieField
 
 
 class AllMoviesPage(ui.Page):
@@ -11,6 +13,9 @@ class AllMoviesPage(ui.Page):
 
     PADDING = 3
 
+    # The most movies given to scripts at once, so a large list isn't built in memory as a single line of JSON
+    RESULT_LIMIT = 100
+
     @staticmethod
     def setup():
         """Initialize the page."""
@@ -20,9 +25,24 @@ class AllMoviesPage(ui.Page):
         """Create a page."""
         super().__init__("Movie List")
         self.movie_index = 0
+        self.version = 0
+
+        # The number of movies, which is None until it has been counted
+        self.movie_count = None
+
+        # The movies that were last fetched from the database, the index of the first one, and how many were asked for
+        # This lets scrolling down continue on from the last movie instead of skipping over rows
+        self.window = []
+        self.window_index = 0
+        self.window_limit = None
+
+        # The field the movies are sorted by, which is None for the default order
+        self.sort_field = None
+        self.descending = False
 
         self.commands.append(Command("w", AllMoviesPage.command_up))
         self.commands.append(Command("s", AllMoviesPage.command_down))
+        self.commands.append(Command("sort", AllMoviesPage.command_sort))
 
     @staticmethod
     def command_movies():
@@ -33,29 +53,145 @@ class AllMoviesPage(ui.Page):
     def command_up():
         """Scroll up the page."""
         ui.current_page.movie_index -= AllMoviesPage.get_number_of_rows()
+        ui.current_page.mark_changed()
 
     @staticmethod
     def command_down():
         """Scroll down the page."""
         ui.current_page.movie_index += AllMoviesPage.get_number_of_rows()
+        ui.current_page.mark_changed()
+
+    @staticmethod
+    def command_sort(field, order="asc"):
+        """Sort the movies by a field in ascending (asc) or descending (desc) order, or go back to the default order."""
+        # The default order can't be reversed, so the order is ignored
+        sort_field = None
+        if field.lower() != "default":
+            sort_field = MovieField.from_str(field)
+            if sort_field not in db.SORT_FIELDS:
+                fields = ", ".join(field.name.lower() for field in db.SORT_FIELDS)
+                ui.current_page.error_message = f"Invalid sort field '{field}' - Must be default, {fields}"
+                return
+
+        if order.lower() not in ["asc", "desc"]:
+            ui.current_page.error_message = f"Invalid sort order '{order}' - Must be asc or desc"
+            return
+
+        page = ui.current_page
+        page.sort_field = sort_field
+        page.descending = sort_field is not None and order.lower() == "desc"
+
+        # Go back to the top, since the movies on the screen are in the old order
+        page.movie_index = 0
+        page.window = []
+        page.window_index = 0
+        page.window_limit = None
+        page.mark_changed()
 
     @staticmethod
     def get_number_of_rows():
         """Get the number of movies that can be displayed."""
         return console.height - AllMoviesPage.PADDING * 2 - 1
 
-    def get_movies(self):
-        """Get the movies to be displayed."""
-        return db.get_all()
+    def get_movie_count(self) -> int:
+        """Get the number of movies that can be displayed."""
+        return db.count()
+
+    def get_movies(self, after: Movie | None, limit: int, offset: int) -> list[Movie]:
+        """Get a page of the movies to be displayed, starting at the offset.
+
+        The movie before the offset is given if it is known, so the page can start after it instead of skipping rows.
+        """
+        return db.get_page(after, limit, offset, sort_field=self.sort_field, descending=self.descending)
+
+    def get_movies_before(self, before: Movie, limit: int, offset: int) -> list[Movie]:
+        """Get the movies that are displayed just before the given movie, which start at the offset."""
+        # The movies before it are the movies after it in the opposite order
+        sort_field = self.sort_field or MovieField.ID
+        movies = db.get_page(before, limit, sort_field=sort_field, descending=not self.descending)
+        return movies[::-1]
+
+    def get_result(self) -> dict:
+        """Get the number of movies and up to RESULT_LIMIT of them, starting at the top of the screen."""
+        movie_count = self.get_movie_count()
+        offset = max(self.movie_index, 0)
+        movies = self.get_movies(None, AllMoviesPage.RESULT_LIMIT, offset)
+        return {"count": movie_count, "offset": offset, "movies": [mdb_io.movie_to_row(movie) for movie in movies]}
+
+    def on_counted(self, movie_count: int):
+        """Remember the number of movies once they have been counted."""
+        self.movie_count = movie_count
+        self.mark_changed()
+
+    def load_window(self, limit: int):
+        """Load the movies that are visible on the screen in the background, starting at the movie index."""
+        movie_index = self.movie_index
+        sort = (self.sort_field, self.descending)
+        window_offset = movie_index - self.window_index
+
+        # Continue on from a movie that has already been fetched if possible, since it avoids skipping rows
+        if 0 < window_offset <= len(self.window):
+            self.run_task(
+                "Loading movies",
+                self.get_movies,
+                self.window[window_offset - 1],
+                limit,
+                movie_index,
+                on_done=lambda movies: self.on_window_loaded(movies, movie_index, limit, sort),
+            )
+            return
+
+        # Scrolling up only needs the movies before the first one that has already been fetched
+        if -limit <= window_offset < 0 and len(self.window) > 0:
+            kept_movies = self.window[: limit + window_offset]
+            self.run_task(
+                "Loading movies",
+                self.get_movies_before,
+                self.window[0],
+                -window_offset,
+                movie_index,
+                on_done=lambda movies: self.on_window_loaded(movies + kept_movies, movie_index, limit, sort),
+            )
+            return
+
+        self.run_task(
+            "Loading movies",
+            self.get_movies,
+            None,
+            limit,
+            movie_index,
+            on_done=lambda movies: self.on_window_loaded(movies, movie_index, limit, sort),
+        )
+
+    def on_window_loaded(self, movies: list, movie_index: int, limit: int, sort: tuple):
+        """Remember the movies that are visible on the screen once they have been loaded."""
+        # Movies loaded before the sort order changed are in the wrong order, so they are loaded again
+        if sort != (self.sort_field, self.descending):
+            self.mark_changed()
+            return
+
+        self.window = movies
+        self.window_index = movie_index
+        self.window_limit = limit
+        self.mark_changed()
 
     def render(self):
         """Render the page."""
         # Write a message to make it clear on how to use it
         console.write(2, 2, "Type 'w' or 's' and press enter to scroll up or down", ui.COLOUR_BLUE)
 
-        # Get the movies
-        movies = self.get_movies()
-        num_movies = len(movies)
+        if self.sort_field is not None:
+            order = "descending" if self.descending else "ascending"
+            console.write(2, 3, f"Sorted by {self.sort_field.name.lower()} in {order} order", ui.COLOUR_LIGHT_BLUE)
+
+        # Count the movies, which has to finish before the list can be drawn
+        if self.movie_count is None and self.task is None:
+            self.run_task("Counting movies", self.get_movie_count, on_done=self.on_counted)
+
+        if self.movie_count is None:
+            return
+
+        num_movies = self.movie_count
 
         # Calculate various values
         number_of_rows = AllMoviesPage.get_number_of_rows()
@@ -84,23 +220,18 @@ class AllMoviesPage(ui.Page):
             console.write(2, movie_y, "No movies found", ui.COLOUR_RED)
             return
 
-        # Draw the list - 1 added for the end of list indicator
-        for i in range(self.movie_index, num_movies + 1):
-            # Subtract the first value in the range to get a 0 based index of what is actually shown on screen
-            index_drawn_in_list = i - self.movie_index
-            if index_drawn_in_list >= number_of_rows:
-                break
-
-            # Exit the loop if we have gone too far
-            if i > num_movies:
-                break
-
-            # End of list indicator
-            if i == num_movies:
-                text = "[End of list]"
-            else:
-                text = movies[i]
-
-            # Draw
-            console.write(2, movie_y, text)
+        # Only get the movies that fit on the screen
+        # The previous movies stay on the screen until they are loaded
+        if (self.window_index, self.window_limit) != (self.movie_index, number_of_rows) and self.task is None:
+            self.load_window(number_of_rows)
+
+        movies = self.window[:number_of_rows]
+
+        # Draw the list
+        for movie in movies:
+            console.write(2, movie_y, movie)
             movie_y += 1
+
+        # End of list indicator
+        if self.window_index + len(movies) >= num_movies and len(movies) < number_of_rows:
+            console.write(2, movie_y, "[End of list]")
@@ -0,0 +1,38 @@
+"""The query page of the UI."""
+
+import mdb_database as db
+import mdb_query
+import mdb_ui as ui
+from mdb_commands import Command, commands
+from pages.search import SearchPage
+
+
+class QueryPage(SearchPage):
+    """The query page of the UI, which searches several fields at once."""
+
+    @staticmethod
+    def setup():
+        """Initialize the page."""
+        commands.append(Command("query", QueryPage.command_query))
+
+    def __init__(self, text: str, sql_filter: db.Filter):
+        """Create a page."""
+        super().__init__(None, None)
+        self.name = f"Query: {text}"
+        self.sql_filter = sql_filter
+
+    @staticmethod
+    def command_query(*expression):
+        """Go to the query page."""
+        # The command splits the query into words, but they are parsed as a whole
+        text = " ".join(expression)
+        (query, error_message) = mdb_query.parse(text)
+        if query is None:
+            ui.current_page.error_message = f"Invalid query '{text}' - {error_message}"
+            return
+
+        ui.current_page = QueryPage(text, mdb_query.compile_query(query))
+
+    def get_ids(self):
+        """Get the IDs of the movies that match the query, in the order they are displayed."""
+        return db.get_filter_ids(db.sort_filter(self.sql_filter, self.sort_field, self.descending))
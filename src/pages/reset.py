@@ -1,5 +1,7 @@
 """The reset page of the UI."""
 
+import sqlite3
+
 import mdb_console as console
 import mdb_database as db
 import mdb_ui as ui
@@ -30,12 +32,29 @@ class ResetPage(ui.Page):
     @staticmethod
     def command_yes():
         """Call when the user enters "no"."""
-        db.reset()
-        ui.current_page.database_reset = True
+        # Don't let the user leave until the database is reset
+        ui.current_page.commands.clear()
+        ui.current_page.run_task("Resetting", ResetPage.reset_database, on_done=ui.current_page.on_reset)
+
+    @staticmethod
+    def reset_database() -> str | None:
+        """Reset the database.
+
+        Returns the error message if it couldn't be reset, or None.
+        """
+        try:
+            db.reset()
+            return None
+        except sqlite3.Error as error:
+            return f"The database couldn't be reset ({error})"
+
+    def on_reset(self, error_message: str | None):
+        """Call once the database has been reset, or failed to be."""
+        self.error_message = error_message
+        self.database_reset = error_message is None
 
         # Allow the user to leave
-        ui.current_page.global_commands_available = True
-        ui.current_page.commands.clear()
+        self.global_commands_available = True
 
     @staticmethod
     def command_no():
@@ -46,13 +65,19 @@ class ResetPage(ui.Page):
         ui.current_page.global_commands_available = True
         ui.current_page.commands.clear()
 
+    def get_result(self) -> dict:
+        """Get whether the database was reset, which is None until the user answers."""
+        return {"reset": self.database_reset}
+
     def render(self):
         """Render the page."""
         message_x = 2
         message_y = 2
 
         # Write a message so the user knows whats happening
-        if self.database_reset is None:
+        if self.task is not None:
+            console.write(message_x, message_y, "Please wait while the database is reset", ui.COLOUR_BLUE)
+        elif self.database_reset is None:
             console.write(message_x, message_y, "Are you sure you want to reset the database?", ui.COLOUR_RED)
         elif self.database_reset:
             console.write(message_x, message_y, "The database was reset", ui.COLOUR_RED)
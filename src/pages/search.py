@@ -3,7 +3,7 @@
 import mdb_database as db
 import mdb_ui as ui
 from mdb_commands import Command, commands
-from mdb_movie import MovieField
+from mdb_movie import Movie, MovieField
 from pages.movies import AllMoviesPage
 
 
@@ -43,6 +43,20 @@ class SearchPage(AllMoviesPage):
         # Go to the page
         ui.current_page = SearchPage(movie_field, parsed_query)
 
-    def get_movies(self):
-        """Get the movies to be displayed."""
-        return db.get_filter(self.field, self.query)
+    def get_ids(self):
+        """Get the IDs of the movies that match the search, in the order they are displayed."""
+        return db.get_ids(self.field, self.query, self.sort_field, self.descending)
+
+    def get_movie_count(self) -> int:
+        """Get the number of movies that can be displayed."""
+        return len(self.get_ids())
+
+    def get_movies(self, after: Movie | None, limit: int, offset: int) -> list[Movie]:
+        """Get a page of the movies to be displayed, starting at the offset."""
+        # The IDs of the results are cached, so scrolling only has to read the movies that are on the screen
+        ids = self.get_ids()
+        return db.get_many(ids[offset : offset + limit])
+
+    def get_movies_before(self, before: Movie, limit: int, offset: int) -> list[Movie]:
+        """Get the movies that are displayed just before the given movie, which start at the offset."""
+        return self.get_movies(None, limit, offset)
@@ -0,0 +1,87 @@
+"""The stats page of the UI."""
+
+import mdb_console as console
+import mdb_database as db
+import mdb_stats as stats
+import mdb_ui as ui
+from mdb_commands import Command, commands
+
+
+class StatsPage(ui.Page):
+    """The stats page of the UI, which shows how long each part of the app takes."""
+
+    # The widths of the columns in the table of timings
+    NAME_WIDTH = 26
+    COUNT_WIDTH = 8
+    TIME_WIDTH = 10
+
+    @staticmethod
+    def setup():
+        """Initialize the page."""
+        commands.append(Command("stats", StatsPage.command_stats))
+
+    def __init__(self):
+        """Create a page."""
+        super().__init__("Stats")
+
+    @staticmethod
+    def command_stats():
+        """Go to the stats page."""
+        ui.current_page = StatsPage()
+
+    @staticmethod
+    def format_milliseconds(seconds: float | None) -> str:
+        """Format a time in seconds as milliseconds."""
+        if seconds is None:
+            return "-"
+
+        return f"{seconds * 1000:.3f}"
+
+    def get_result(self) -> dict:
+        """Get all of the stats."""
+        return stats.to_dict(db.get_cache_counters())
+
+    def render(self):
+        """Render the page."""
+        x = 2
+        y = 3
+
+        # The caches and frames are always counted, even without timings
+        counters = db.get_cache_counters()
+        movie_cache = f"{counters['movie_cache_hits']} hits, {counters['movie_cache_misses']} misses"
+        search_cache = f"{counters['search_cache_hits']} hits, {counters['search_cache_misses']} misses"
+        console.write(x, y, f"Movie cache: {movie_cache} ({counters['movie_cache_size']} movies)")
+        console.write(x, y + 1, f"Search cache: {search_cache} ({counters['search_cache_size']} searches)")
+        last_frame = f"{console.last_cells_rendered} cells rendered, {console.frame_size} characters"
+        console.write(x, y + 2, f"Last frame: {last_frame}")
+        y += 4
+
+        if not stats.enabled:
+            console.write(x, y, "Set MDB_STATS=1 to record how long each part takes", ui.COLOUR_BLUE)
+            return
+
+        # Header
+        columns = ["Timing (ms)", "Count", "Mean", "p50", "p95", "Max"]
+        self.write_row(x, y, columns, ui.COLOUR_YELLOW)
+        y += 1
+
+        # Show as many timings as fit above the error message
+        for name, histogram in sorted(stats.timings.items()):
+            if y >= console.height - 3:
+                break
+
+            times = [histogram.mean, histogram.percentile(50), histogram.percentile(95), histogram.max]
+            row = [name, str(histogram.count)] + [StatsPage.format_milliseconds(time) for time in times]
+            self.write_row(x, y, row, ui.COLOUR_LIGHT_BLUE)
+            y += 1
+
+    def write_row(self, x: int, y: int, columns: list[str], colour: tuple[int, int, int]):
+        """Write a row of the table of timings."""
+        console.write(x, y, columns[0][: StatsPage.NAME_WIDTH - 1], colour)
+        x += StatsPage.NAME_WIDTH
+        console.write(x, y, columns[1].rjust(StatsPage.COUNT_WIDTH), colour)
+        x += StatsPage.COUNT_WIDTH
+
+        for column in columns[2:]:
+            console.write(x, y, column.rjust(StatsPage.TIME_WIDTH), colour)
+            x += StatsPage.TIME_WIDTH